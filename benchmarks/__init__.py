@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+from pyhomogenize.data import synthetic_netcdf
+
+tmp_dir = tempfile.mkdtemp(prefix="pyhomogenize-benchmarks-")
+
+
+def synthetic_file(**kwargs):
+    """Write synthetic netCDF file once per parameter combination."""
+    name = "_".join("{}-{}".format(key, kwargs[key]) for key in sorted(kwargs))
+    path = os.path.join(tmp_dir, "{}.nc".format(name))
+    if not os.path.isfile(path):
+        synthetic_netcdf(path, **kwargs)
+    return path
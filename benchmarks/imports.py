@@ -0,0 +1,18 @@
+class Imports:
+    """Import time of the package and startup time of the command-line
+    interface.
+    """
+
+    def timeraw_import_pyhomogenize(self):
+        return "import pyhomogenize"
+
+    def timeraw_import_time_control(self):
+        return "from pyhomogenize import time_control"
+
+    def timeraw_cli_operators(self):
+        return """
+        import pyhomogenize as pyh
+
+        parser = pyh.create_parser()
+        pyh.pyhomogenize(parser.parse_args(["-ops"]))
+        """
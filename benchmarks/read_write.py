@@ -0,0 +1,31 @@
+import os
+
+import pyhomogenize as pyh
+
+from . import synthetic_file, tmp_dir
+
+
+class ReadWrite:
+    """Opening and writing of netCDF files of different grid sizes."""
+
+    params = ([365, 3650], [10, 100])
+    param_names = ["length", "grid"]
+    timeout = 300
+
+    def setup(self, length, grid):
+        self.file = synthetic_file(length=length, grid=(grid, grid))
+        self.ds = pyh.open_xrdataset(self.file).load()
+        output = "output_{}_{}.nc".format(length, grid)
+        self.output = os.path.join(tmp_dir, output)
+
+    def time_open_xrdataset(self, length, grid):
+        pyh.open_xrdataset(self.file)
+
+    def time_open_xrdataset_load(self, length, grid):
+        pyh.open_xrdataset(self.file).load()
+
+    def time_save_xrdataset(self, length, grid):
+        pyh.save_xrdataset(self.ds, name=self.output)
+
+    def peakmem_open_xrdataset_load(self, length, grid):
+        pyh.open_xrdataset(self.file).load()
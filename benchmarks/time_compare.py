@@ -0,0 +1,25 @@
+import pyhomogenize as pyh
+
+from . import synthetic_file
+
+
+class TimeCompare:
+    """Time axis intersection of several members."""
+
+    params = ([2, 8], [1000, 100000])
+    param_names = ["members", "length"]
+    timeout = 300
+
+    def setup(self, members, length):
+        self.files = [
+            synthetic_file(
+                frequency="1hr",
+                length=length - 10 * member,
+                start="2000-01-{:02d}".format(member + 1),
+                grid=(2, 2),
+            )
+            for member in range(members)
+        ]
+
+    def time_max_intersection(self, members, length):
+        pyh.time_compare(*self.files).max_intersection()
@@ -0,0 +1,65 @@
+import os
+
+import pyhomogenize as pyh
+
+from . import synthetic_file, tmp_dir
+
+
+class TimeControl:
+    """Time axis checks on a single file with anomalies injected."""
+
+    params = (["1hr", "day", "mon"], [1000, 100000])
+    param_names = ["frequency", "length"]
+    timeout = 300
+
+    def setup(self, frequency, length):
+        if frequency == "mon":
+            length = length // 10
+        self.file = synthetic_file(
+            frequency=frequency,
+            length=length,
+            grid=(2, 2),
+            duplicates=10,
+            missings=10,
+        )
+
+    def time_time_control(self, frequency, length):
+        pyh.time_control(self.file).time
+
+    def time_check_timestamps(self, frequency, length):
+        # a fresh object each repeat; check_timestamps appends to attributes
+        pyh.time_control(self.file).check_timestamps()
+
+    def time_check_timestamps_correct(self, frequency, length):
+        pyh.time_control(self.file).check_timestamps(correct=True)
+
+    def time_select_time_range(self, frequency, length):
+        tc = pyh.time_control(self.file)
+        tc.select_time_range(["2000-02-01", "2000-03-31"])
+
+    def peakmem_check_timestamps(self, frequency, length):
+        pyh.time_control(self.file).check_timestamps(correct=True)
+
+
+class MemoryLimit:
+    """Peak memory of writing a checked time axis of a file
+    three times larger than the memory budget.
+    """
+
+    params = [None, "256MB"]
+    param_names = ["memory_limit"]
+    timeout = 600
+
+    def setup_cache(self):
+        # written in a separate process not to count for peak memory
+        return synthetic_file(
+            length=1200,
+            grid=(400, 400),
+            duplicates=10,
+            missings=10,
+        )
+
+    def peakmem_check_timestamps_output(self, file, memory_limit):
+        output = os.path.join(tmp_dir, "memory_limit.nc")
+        tc = pyh.time_control(file, memory_limit=memory_limit)
+        tc.check_timestamps(output=output)
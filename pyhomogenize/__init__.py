@@ -3,12 +3,8 @@
 
 """Top-level package for pyhomogenize."""
 
-from . import _read_write as read_write
-from ._basics import basics
-from ._netcdf_basics import netcdf_basics
-from ._read_write import get_var_name, open_xrdataset, save_xrdataset
-from ._time_compare import time_compare
-from ._time_control import time_control
+import importlib
+
 from .cli import create_parser
 from .data import netcdf as test_netcdf
 from .pyhomogenize import pyhomogenize
@@ -25,6 +21,55 @@ _all__ = [
     "test_netcdf",
     "pyhomogenize",
     "open_xrdataset",
+    "open_time_axis",
     "get_var_name",
+    "classify_variables",
     "save_xrdataset",
+    "time_axis_cache",
+    "add_span_callback",
+    "remove_span_callback",
+    "span_recorder",
+    "scheduler_context",
+    "atime_control",
+    "atime_compare",
+    "acheck_timestamps",
 ]
+
+# The numeric stack (xarray, pandas, cftime, dask) is imported
+# on first access of the classes and functions below.
+_lazy = {
+    "read_write": ("._read_write", None),
+    "basics": ("._basics", "basics"),
+    "netcdf_basics": ("._netcdf_basics", "netcdf_basics"),
+    "time_control": ("._time_control", "time_control"),
+    "time_compare": ("._time_compare", "time_compare"),
+    "time_axis_cache": ("._cache", "time_axis_cache"),
+    "get_var_name": ("._read_write", "get_var_name"),
+    "classify_variables": ("._read_write", "classify_variables"),
+    "open_time_axis": ("._read_write", "open_time_axis"),
+    "open_xrdataset": ("._read_write", "open_xrdataset"),
+    "save_xrdataset": ("._read_write", "save_xrdataset"),
+    "add_span_callback": ("._instrumentation", "add_span_callback"),
+    "remove_span_callback": ("._instrumentation", "remove_span_callback"),
+    "span_recorder": ("._instrumentation", "span_recorder"),
+    "scheduler_context": ("._scheduler", "scheduler_context"),
+    "atime_control": ("._aio", "atime_control"),
+    "atime_compare": ("._aio", "atime_compare"),
+    "acheck_timestamps": ("._aio", "acheck_timestamps"),
+}
+
+
+def __getattr__(name):
+    if name in _lazy:
+        module, attr = _lazy[name]
+        value = importlib.import_module(module, __name__)
+        if attr:
+            value = getattr(value, attr)
+        globals()[name] = value
+        return value
+    msg = "module {} has no attribute {}".format(__name__, name)
+    raise AttributeError(msg)
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
@@ -0,0 +1,271 @@
+"""asyncio counterparts of ``time_control`` and ``time_compare``.
+
+Opening files and scanning time axes block on netCDF I/O. The blocking
+calls run in a bounded pool of threads so that the event loop keeps
+running and many files are inspected concurrently. All coroutines
+return the same objects as the synchronous API.
+
+Cancelled or timed out calls not yet started are removed from the pool.
+Calls already running in a thread can not be interrupted and finish in
+the background; their results are discarded.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from ._basics import basics
+from ._time_compare import _open_time_control, time_compare
+from ._time_control import time_control
+
+# Number of threads of the default executor. None uses the default
+# of ``ThreadPoolExecutor``.
+workers = None
+
+_executor = None
+
+
+def get_executor():
+    """Get default executor shared by all coroutines.
+
+    Returns
+    -------
+    concurrent.futures.ThreadPoolExecutor
+        Pool of `workers` threads started on first use.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="pyhomogenize",
+        )
+    return _executor
+
+
+async def arun(func, *args, executor=None, timeout=None, **kwargs):
+    """Run blocking `func` in an executor without blocking the event loop.
+
+    Parameters
+    ----------
+    func: callable
+        Blocking function called with `args` and `kwargs`.
+    executor: concurrent.futures.Executor, optional
+        Pool running `func`. Default is `get_executor`.
+    timeout: float, optional
+        Seconds to wait for the result.
+
+    Returns
+    -------
+    Return value of `func`.
+
+    Raises
+    ------
+    asyncio.TimeoutError
+        If `func` does not finish within `timeout`.
+    """
+    if executor is None:
+        executor = get_executor()
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(
+        executor,
+        functools.partial(func, *args, **kwargs),
+    )
+    return await asyncio.wait_for(future, timeout)
+
+
+def _call(tco, method, *args, **kwargs):
+    """Open `tco` if needed and call its `method`."""
+    if not isinstance(tco, time_control):
+        tco = time_control(tco)
+    return getattr(tco, method)(*args, **kwargs)
+
+
+class atime_control:
+    """asyncio counterpart of ``time_control``.
+
+    Example
+    -------
+    To check the time axes of many netCDF files concurrently::
+
+        import asyncio
+
+        from pyhomogenize import atime_control
+
+        async def check(files):
+            tcos = await asyncio.gather(
+                *[atime_control.open(file) for file in files]
+            )
+            return await asyncio.gather(
+                *[atime_control.check_timestamps(tco) for tco in tcos]
+            )
+
+        asyncio.run(check(['input1.nc', 'input2.nc']))
+    """
+
+    @staticmethod
+    async def open(files, executor=None, timeout=None, **kwargs):
+        """Open `files` and read the time axis.
+
+        Parameters
+        ----------
+        files: str or list
+            file on disk or xarray.Dataset or list of both
+        executor: concurrent.futures.Executor, optional
+            See `arun`.
+        timeout: float, optional
+            See `arun`.
+        kwargs:
+            Optional parameters transferred to ``time_control``.
+
+        Returns
+        -------
+        time_control
+        """
+        return await arun(
+            _open_time_control,
+            files,
+            executor=executor,
+            timeout=timeout,
+            **kwargs,
+        )
+
+    @staticmethod
+    async def check_timestamps(tco, executor=None, timeout=None, **kwargs):
+        """Check time axis. See ``time_control.check_timestamps``.
+
+        Parameters
+        ----------
+        tco: time_control or str or list
+            ``time_control`` object or files opened
+            as ``time_control`` object.
+        executor: concurrent.futures.Executor, optional
+            See `arun`.
+        timeout: float, optional
+            See `arun`.
+        kwargs:
+            Optional parameters transferred to
+            ``time_control.check_timestamps``.
+
+        Returns
+        -------
+        time_control
+        """
+        return await arun(
+            _call,
+            tco,
+            "check_timestamps",
+            executor=executor,
+            timeout=timeout,
+            **kwargs,
+        )
+
+    @staticmethod
+    async def get_duplicates(tco, executor=None, timeout=None, **kwargs):
+        """Get string of duplicated time steps.
+        See `check_timestamps` and ``time_control.get_duplicates``.
+        """
+        return await arun(
+            _call,
+            tco,
+            "get_duplicates",
+            executor=executor,
+            timeout=timeout,
+            **kwargs,
+        )
+
+    @staticmethod
+    async def get_missings(tco, executor=None, timeout=None, **kwargs):
+        """Get string of missing time steps.
+        See `check_timestamps` and ``time_control.get_missings``.
+        """
+        return await arun(
+            _call,
+            tco,
+            "get_missings",
+            executor=executor,
+            timeout=timeout,
+            **kwargs,
+        )
+
+    @staticmethod
+    async def get_redundants(tco, executor=None, timeout=None, **kwargs):
+        """Get string of redundant time steps.
+        See `check_timestamps` and ``time_control.get_redundants``.
+        """
+        return await arun(
+            _call,
+            tco,
+            "get_redundants",
+            executor=executor,
+            timeout=timeout,
+            **kwargs,
+        )
+
+
+acheck_timestamps = atime_control.check_timestamps
+
+
+class atime_compare:
+    """asyncio counterpart of ``time_compare``."""
+
+    @staticmethod
+    async def open(*compare_objects, executor=None, timeout=None, **kwargs):
+        """Open all `compare_objects` concurrently.
+
+        `compare_objects` which could not be opened within `timeout`
+        are reported and written to `failures` as by ``time_compare``.
+
+        Parameters
+        ----------
+        compare_objects: str or list or nested list
+            List of all objects to compare their time axes
+        executor: concurrent.futures.Executor, optional
+            See `arun`.
+        timeout: float, optional
+            Seconds to wait for each of `compare_objects`.
+        kwargs:
+            Optional parameters transferred to each ``time_control``
+            object. Default mode is `time`. See ``time_compare``.
+
+        Returns
+        -------
+        time_compare
+
+        Raises
+        ------
+        ValueError
+            If none of the `compare_objects` could be opened.
+        """
+        kwargs.setdefault("mode", "time")
+        identities = basics()._flatten_list(compare_objects)
+
+        async def _open(identity):
+            if isinstance(identity, time_control):
+                return identity
+            return await atime_control.open(
+                identity,
+                executor=executor,
+                timeout=timeout,
+                **kwargs,
+            )
+
+        results = await asyncio.gather(
+            *[_open(identity) for identity in identities],
+            return_exceptions=True,
+        )
+        failures = []
+        for identity, result in zip(identities, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, Exception):
+                print("Could not open {}: {}".format(identity, result))
+                failures += [(identity, result)]
+        tcos = [tco for tco in results if isinstance(tco, time_control)]
+        if identities and not tcos:
+            raise ValueError(
+                "Could not open any of {}.".format(identities)
+            ) from failures[0][1]
+        tcm = time_compare(*tcos, **kwargs)
+        tcm.compare_objects = identities
+        tcm.failures = failures
+        return tcm
@@ -1,12 +1,14 @@
 import copy
-from datetime import datetime as dt
+import re
 from datetime import timedelta as td
 
-import cftime
+import numpy as np
 import pandas as pd
 import xarray as xr
 
 from . import _consts as consts
+from . import _time_encoding as encoding
+from . import _time_parsing as parsing
 
 
 class basics:
@@ -92,14 +94,14 @@ class basics:
         """
         if not fmt:
             fmt = self.fmt
-        converted = ""
+        converted = []
         for v in values:
             try:
                 v = self.date_to_str(v, fmt=fmt)
             except Exception:
                 pass
-            converted += str(v) + delim
-        return converted[:-1]
+            converted += [str(v)]
+        return delim.join(converted)
 
     def _dictionary(self, attr, keys, value):
         """Write or update attribute using key-value pairs
@@ -156,50 +158,41 @@ class basics:
         return consts.translator[f]
 
     def str_to_date(self, str, fmt=None, mode="start", calendar=None):
-        """Converts string to ``cftime.datetime`` object
+        """Converts string or array of strings to ``cftime.datetime`` objects
 
         Parameters
         ----------
-        str: str
-            string representing the time
+        str: str or array-like
+            string(s) representing the time
         fmt: str, default: '%Y-%m-%dT%H:%M:%S'
-            Explicit format string
+            Explicit format string. Leading parts of `fmt` are
+            sufficient, e.g. '2007' and '2007-06-01T12' match the default.
         calendar: str, default: 'standard'
             Calendar type for the datetimes
         mode: {'start', 'end'}, default: 'start'
             `start`: Set ``cftime.datetime`` instance attributes
-            not represented by `fmt` to 0.
+            not represented by `str` to their first possible values.
             `end`: Set ``cftime.datetime`` instance attributes
-            not represented by `fmt` to last possible values
-            considering `str`.
+            not represented by `str` to last possible values
+            considering `str`, e.g. '2007' is converted to
+            2007-12-31T23:59:59.
 
         Returns
         -------
-        ``cftime.datetime`` object
+        ``cftime.datetime`` object or list of ``cftime.datetime`` objects
+
+        Raises
+        ------
+        ValueError
+            If `str` does not match `fmt` or is not a valid date.
         """
-        i = 1
         if not fmt:
             fmt = self.fmt
         if not calendar:
             calendar = self.calendar
         if mode not in ["start", "end"]:
             return
-        while True:
-            try:
-                date = dt.strptime(str, fmt[:i])
-                break
-            except Exception:
-                i += 1
-        cfdate = cftime.datetime(
-            date.year,
-            date.month,
-            date.day,
-            calendar=calendar,
-        )
-        if mode == "start":
-            return cfdate
-        if mode == "end":
-            return cfdate + td(days=1) - td(seconds=1)
+        return parsing.parse(str, fmt, calendar=calendar, mode=mode)
 
     def date_to_str(self, date, fmt=None):
         """Converts ``cftime.datetime`` or ``datetime.datetime`` object to string
@@ -221,21 +214,124 @@ class basics:
         return date.strftime(fmt)
 
     def _convert_time(self, time):
-        """Converts time object to ``datetime.datetime`` object"""
+        """Converts time coordinate to ``DatetimeIndex`` or ``CFTimeIndex``
+
+        Decoded time axes are returned unchanged. Numeric time values
+        are decoded without any conversion to strings: relative units,
+        e.g. 'days since 1850-01-01', via ``xr.decode_cf`` and
+        absolute units, e.g. 'day as %Y%m%d.%f', arithmetically.
+        Standard calendars within the range of ``datetime64[ns]``
+        are decoded to ``DatetimeIndex``.
+
+        Parameters
+        ----------
+        time: xr.DataArray
+            Time coordinate
+
+        Returns
+        -------
+        DatetimeIndex or CFTimeIndex
+        """
+        index = time.indexes["time"]
+        if index.dtype.kind not in "iuf":
+            return index
+        units = time.attrs.get("units", "")
+        calendar = time.attrs.get("calendar", "standard")
         try:
-            return pd.to_datetime(
-                time.indexes["time"].astype("str"),
-                format=time.units.split(" ")[-1],
+            if " as " not in units:
+                time = xr.Dataset(coords={"time": time.variable})
+                return xr.decode_cf(time).indexes["time"]
+            ordinals = encoding.decode_absolute(
+                time.values,
+                units=units,
+                calendar=calendar,
             )
         except Exception:
-            return time.indexes["time"]
+            return index
+        datetime64 = encoding.to_datetime64(ordinals)
+        lower, upper = np.array(
+            consts.datetime64_range,
+            dtype=datetime64.dtype,
+        )
+        within = (datetime64 >= lower) & (datetime64 < upper)
+        if calendar in consts.datetime64_calendars and within.all():
+            datetime64 = datetime64.astype("datetime64[ns]")
+            return pd.DatetimeIndex(datetime64, name="time")
+        dates = encoding.decode(
+            ordinals,
+            resolution="second",
+            calendar=calendar,
+            fill=0,
+        )
+        return xr.CFTimeIndex(dates, name="time")
+
+    def _encode_time(
+        self,
+        time,
+        ignore=["second", "microsecond", "nanosecond"],
+        calendar=None,
+    ):
+        """Encode time axis as calendar-aware int64 ordinals
+        truncated to the finest instance attribute not ignored.
+
+        Parameters
+        ----------
+        time: CFTimeIndex or DatetimeIndex
+            Time axis to be encoded
+        ignore: list, default: ['second','microsecond','nanosecond']
+            list of datetime.datetime instance attributes to be ignored
+        calendar: str, optional
+            Calendar type for the datetimes.
+            Default is the inherent calendar of `time`.
+
+        Returns
+        -------
+        np.ndarray
+            int64 ordinals
+        """
+        return encoding.encode(
+            time,
+            resolution=encoding.get_resolution(ignore),
+            calendar=calendar,
+        )
+
+    def _decode_time(
+        self,
+        ordinals,
+        ignore=["second", "microsecond", "nanosecond"],
+        calendar=None,
+    ):
+        """Decode int64 ordinals to ``cftime.datetime`` objects.
+        Ignored instance attributes are set to 1.
+
+        Parameters
+        ----------
+        ordinals: np.ndarray
+            int64 ordinals; see `_encode_time`
+        ignore: list, default: ['second','microsecond','nanosecond']
+            list of datetime.datetime instance attributes to be ignored
+        calendar: str, default: 'standard'
+            Calendar type for the datetimes
+
+        Returns
+        -------
+        list
+            list of ``cftime.datetime`` objects
+        """
+        if not calendar:
+            calendar = self.calendar
+        return encoding.decode(
+            ordinals,
+            resolution=encoding.get_resolution(ignore),
+            calendar=calendar,
+        )
 
     def _equalize_time(
         self,
         time,
         ignore=["second", "microsecond", "nanosecond"],
     ):
-        """Ignore ``datetime.datetime`` instance attributes and set them to 0
+        """Ignore ``datetime.datetime`` instance attributes and set them to 1
 
         Parameters
         ----------
@@ -246,23 +342,16 @@ class basics:
 
         Returns
         -------
-        time: CFTimeIndex
-            ``CFTimeIndex`` containing ``cftime.datetime`` objects
+        time: list
+            list of ``cftime.datetime`` objects
             with ignored instance attributes
         """
-        n = 0
-        while n < len(ignore):
-            etime = time.tolist()
-            query = {ignr: 1 for ignr in ignore[::-1][n:]}
-            try:
-                i = 0
-                while i < len(etime):
-                    etime[i] = etime[i].replace(**query)
-                    i += 1
-                return etime
-            except Exception:
-                n += 1
-        return time.tolist()
+        calendar = encoding.get_calendar(time)
+        return self._decode_time(
+            self._encode_time(time, ignore=ignore, calendar=calendar),
+            ignore=ignore,
+            calendar=calendar,
+        )
 
     def _interpret_frequency(self, freq):
         if isinstance(freq, str):
@@ -270,6 +359,130 @@ class basics:
                 freq = consts.frequencies[freq]
         return freq
 
+    def _get_step(self, frequency, resolution):
+        """Get integer step between consecutive encoded time steps.
+
+        Parameters
+        ----------
+        frequency: str or list
+            CF frequency or frequency string or list of frequency strings
+            for use with ``cftime`` calendars
+        resolution: {'year', 'month', 'day', 'hour', 'minute', 'second'}
+            Resolution of the encoded time axis.
+            See `_encode_time`.
+
+        Returns
+        -------
+        int or None
+            None if `frequency` is not a multiple of `resolution`.
+        """
+        frequency = self._interpret_frequency(frequency)
+        if isinstance(frequency, list):
+            frequency = frequency[0]
+        if not isinstance(frequency, str):
+            return
+        match = re.fullmatch(r"(\d*)([A-Za-z]+)(-[A-Za-z]+)?", frequency)
+        if not match or match.group(2) not in consts.offsets.keys():
+            return
+        multiple = int(match.group(1) or 1)
+        unit = consts.offsets[match.group(2)]
+        if unit in consts.months.keys():
+            if resolution not in consts.months.keys():
+                return
+            step = multiple * consts.months[unit]
+            length = consts.months[resolution]
+        else:
+            if resolution not in encoding.per_day.keys():
+                return
+            step = multiple * encoding.per_day[resolution]
+            length = encoding.per_day[unit]
+        if step % length:
+            return
+        return step // length
+
+    def _arithmetic_range(self, values, start, end, step):
+        """Compare sorted unique encoded time steps with the expected
+        time axis without materialising it.
+
+        Parameters
+        ----------
+        values: np.ndarray
+            Sorted unique int64 ordinals
+        start: int
+            First expected int64 ordinal
+        end: int
+            Last possible int64 ordinal
+        step: int
+            Step between consecutive expected int64 ordinals
+
+        Returns
+        -------
+        found: np.ndarray
+            boolean mask of `values` on the expected time axis
+        starts: np.ndarray
+            First int64 ordinal of each run of missing time steps
+        counts: np.ndarray
+            Number of missing time steps of each run
+        """
+        offset = values - start
+        found = (offset >= 0) & (values <= end) & (offset % step == 0)
+        if end < start:
+            empty = np.array([], dtype="int64")
+            return found, empty, empty
+        nsteps = (end - start) // step
+        index = np.concatenate([[-1], offset[found] // step, [nsteps + 1]])
+        gaps = np.diff(index) - 1
+        runs = gaps > 0
+        starts = start + (index[:-1][runs] + 1) * step
+        return found, starts, gaps[runs]
+
+    def _expand_runs(self, starts, counts, step):
+        """Expand runs of equidistant int64 ordinals.
+
+        Parameters
+        ----------
+        starts: np.ndarray
+            First int64 ordinal of each run
+        counts: np.ndarray
+            Number of int64 ordinals of each run
+        step: int
+            Step between consecutive int64 ordinals
+
+        Returns
+        -------
+        np.ndarray
+            int64 ordinals
+        """
+        index = np.arange(counts.sum(), dtype="int64")
+        shift = np.repeat(np.cumsum(counts) - counts, counts)
+        return np.repeat(starts, counts) + (index - shift) * step
+
+    def _find_runs(self, values, step):
+        """Locate runs of equidistant int64 ordinals.
+
+        Parameters
+        ----------
+        values: np.ndarray
+            Sorted int64 ordinals
+        step: int
+            Step between consecutive int64 ordinals of a run
+
+        Returns
+        -------
+        firsts: np.ndarray
+            Index of the first int64 ordinal of each run
+        lasts: np.ndarray
+            Index of the last int64 ordinal of each run
+        counts: np.ndarray
+            Number of int64 ordinals of each run
+        """
+        breaks = np.flatnonzero(np.diff(values) != step) + 1
+        firsts = np.concatenate([[0], breaks])
+        lasts = np.concatenate([breaks, [len(values)]]) - 1
+        if not len(values):
+            firsts = lasts = np.array([], dtype="int64")
+        return firsts, lasts, lasts - firsts + 1
+
     def _mid_timestep(self, freq, st, end, calendar=None):
         """Build ``CFTimeIndex``
         Set elements between user-given frequencies
@@ -0,0 +1,191 @@
+import contextlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+import xarray as xr
+
+environment_variable = "PYHOMOGENIZE_CACHE_DIR"
+
+
+def _to_json(attrs):
+    """Serialize attributes containing numpy types."""
+
+    def default(value):
+        if hasattr(value, "tolist"):
+            return value.tolist()
+        return str(value)
+
+    return json.dumps(attrs, default=default)
+
+
+def get_cache(cache=None):
+    """Get ``time_axis_cache`` object.
+
+    Parameters
+    ----------
+    cache: str or time_axis_cache, optional
+        Cache directory or ``time_axis_cache`` object.
+        Default is the environment variable `PYHOMOGENIZE_CACHE_DIR`.
+
+    Returns
+    -------
+    time_axis_cache or None
+        None if neither `cache` nor the environment variable is set.
+    """
+    if isinstance(cache, time_axis_cache):
+        return cache
+    if not cache:
+        cache = os.environ.get(environment_variable)
+    if not cache:
+        return
+    return time_axis_cache(cache)
+
+
+class time_axis_cache:
+    """Persistent on-disk index of netCDF files' time axes.
+
+    Each file's encoded time values, time attributes, global attributes
+    and CF roles of all variables are stored in a SQLite database keyed by
+    the file's path, size and modification time. Unchanged files are
+    read from the cache at the cost of a single stat call.
+    Least recently used entries are evicted if the cache exceeds
+    `max_size`.
+
+    Parameters
+    ----------
+    cache_dir: str, optional
+        Directory of the SQLite database.
+        Default is the environment variable `PYHOMOGENIZE_CACHE_DIR`.
+    max_size: int, default: 512
+        Maximum size of all cached time values in MB.
+    """
+
+    filename = "time_axes.sqlite"
+
+    def __init__(self, cache_dir=None, max_size=512):
+        if not cache_dir:
+            cache_dir = os.environ[environment_variable]
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.database = os.path.join(cache_dir, self.filename)
+        with self._connect() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS time_axes ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, "
+                "dtype TEXT, time BLOB, units TEXT, calendar TEXT, "
+                "frequency TEXT, variables TEXT, time_attrs TEXT, "
+                "attrs TEXT, nbytes INTEGER, accessed REAL)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.database, timeout=60)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def _identity(self, file):
+        """Path, size and modification time of `file`."""
+        stat = os.stat(file)
+        return os.path.abspath(file), stat.st_size, stat.st_mtime_ns
+
+    def get(self, file):
+        """Get cached time axis of `file`.
+
+        Parameters
+        ----------
+        file: str
+            File on disk.
+
+        Returns
+        -------
+        tuple or None
+            Encoded time axis as xr.Dataset and CF roles of all
+            variables. See ``classify_variables``.
+            None if `file` is not cached or has changed since.
+        """
+        path, size, mtime = self._identity(file)
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT dtype, time, variables, time_attrs, attrs "
+                "FROM time_axes WHERE path=? AND size=? AND mtime=?",
+                (path, size, mtime),
+            ).fetchone()
+            if row is None:
+                return
+            con.execute(
+                "UPDATE time_axes SET accessed=? WHERE path=?",
+                (time.time(), path),
+            )
+        dtype, values, variables, time_attrs, attrs = row
+        segment = xr.Dataset(
+            coords={
+                "time": (
+                    "time",
+                    np.frombuffer(values, dtype=dtype),
+                    json.loads(time_attrs),
+                )
+            },
+            attrs=json.loads(attrs),
+        )
+        return segment, json.loads(variables)
+
+    def put(self, file, segment, variables):
+        """Write encoded time axis of `file` to the cache.
+
+        Parameters
+        ----------
+        file: str
+            File on disk.
+        segment: xr.Dataset
+            Dataset containing the encoded time coordinate only.
+        variables: dict
+            CF roles of all variables of `file`.
+            See ``classify_variables``.
+        """
+        path, size, mtime = self._identity(file)
+        values = np.ascontiguousarray(segment.time.values)
+        time_attrs = segment.time.attrs
+        with self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO time_axes VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    size,
+                    mtime,
+                    values.dtype.str,
+                    values.tobytes(),
+                    str(time_attrs.get("units")),
+                    str(time_attrs.get("calendar", "standard")),
+                    str(segment.attrs.get("frequency")),
+                    json.dumps(variables),
+                    _to_json(time_attrs),
+                    _to_json(segment.attrs),
+                    values.nbytes,
+                    time.time(),
+                ),
+            )
+            self._evict(con)
+
+    def _evict(self, con):
+        """Delete least recently used entries exceeding `max_size`."""
+        rows = con.execute(
+            "SELECT path, nbytes FROM time_axes ORDER BY accessed DESC"
+        ).fetchall()
+        total = 0
+        for path, nbytes in rows:
+            total += nbytes
+            if total > self.max_size * 1024**2:
+                con.execute("DELETE FROM time_axes WHERE path=?", (path,))
+
+    def clear(self):
+        """Delete all entries."""
+        with self._connect() as con:
+            con.execute("DELETE FROM time_axes")
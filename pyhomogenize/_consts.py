@@ -34,6 +34,33 @@ format = {
     "fx": None,
 }
 
+offsets = {
+    "S": "second",
+    "s": "second",
+    "T": "minute",
+    "min": "minute",
+    "H": "hour",
+    "h": "hour",
+    "D": "day",
+    "MS": "month",
+    "M": "month",
+    "ME": "month",
+    "QS": "quarter",
+    "Q": "quarter",
+    "QE": "quarter",
+    "AS": "year",
+    "A": "year",
+    "YS": "year",
+    "Y": "year",
+    "YE": "year",
+}
+
+months = {
+    "month": 1,
+    "quarter": 3,
+    "year": 12,
+}
+
 is_month = {
     "hour": True,
     "day": True,
@@ -114,3 +141,7 @@ naming = {
     "redundants": "redundant_timesteps",
     "missings": "missing_timesteps",
 }
+
+datetime64_calendars = ["standard", "gregorian", "proleptic_gregorian"]
+
+datetime64_range = ["1678-01-01", "2262-01-01"]
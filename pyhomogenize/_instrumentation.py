@@ -0,0 +1,223 @@
+"""Named spans recording wall time and resource usage of processing stages.
+
+Spans are only measured if at least one callback is registered.
+Each callback is called with one record per finished span.
+"""
+
+import json
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+callbacks = []
+
+_local = threading.local()
+
+
+def add_span_callback(callback):
+    """Register `callback` called with the record of each finished span.
+
+    Parameters
+    ----------
+    callback: callable
+        Function accepting one dictionary with the keys
+        `name`, `parent`, `wall_time`, `peak_rss`, `peak_rss_increase`,
+        `bytes_read`, `bytes_written`, `dask_tasks` and `error`
+        plus additional information of the span.
+    """
+    if callback not in callbacks:
+        callbacks.append(callback)
+
+
+def remove_span_callback(callback):
+    """Unregister `callback`. See `add_span_callback`."""
+    if callback in callbacks:
+        callbacks.remove(callback)
+
+
+def _peak_rss():
+    """Peak resident set size of the process in bytes.
+
+    The high water mark of ``/proc`` is preferred since ``ru_maxrss``
+    includes the peak of the parent process before forking.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    if resource is None:
+        return
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak
+    return peak * 1024
+
+
+def _io_counters():
+    """Bytes read and written by the process via system calls."""
+    counters = {}
+    try:
+        with open("/proc/self/io") as io:
+            for line in io:
+                key, value = line.split(":")
+                counters[key] = int(value)
+    except (OSError, ValueError):
+        return None, None
+    return counters.get("rchar"), counters.get("wchar")
+
+
+def _difference(end, start):
+    if end is None or start is None:
+        return
+    return end - start
+
+
+def _dask_tasks(obj):
+    """Number of tasks in the dask graph of `obj`."""
+    graph = getattr(obj, "__dask_graph__", lambda: None)()
+    if graph is None:
+        return 0
+    return len(graph)
+
+
+class span:
+    """Context manager measuring a named processing stage.
+
+    Parameters
+    ----------
+    name: str
+        Name of the stage, e.g. `open`, `decode` or `write`.
+    info:
+        Additional information written to the span's record.
+
+    Example
+    -------
+    To report all spans of a time axis check::
+
+        import pyhomogenize as pyh
+
+        pyh.add_span_callback(print)
+        pyh.time_control('input.nc').check_timestamps()
+    """
+
+    def __init__(self, name, **info):
+        self.name = name
+        self.info = info
+        self.record = None
+
+    def __enter__(self):
+        if not callbacks:
+            return self
+        stack = getattr(_local, "stack", [])
+        _local.stack = stack
+        parent = None
+        if stack:
+            parent = stack[-1].name
+        stack.append(self)
+        self.record = {"name": self.name, "parent": parent, "dask_tasks": None}
+        self._peak_rss = _peak_rss()
+        self._read, self._written = _io_counters()
+        self._start = time.perf_counter()
+        return self
+
+    def tasks(self, obj):
+        """Write number of dask tasks of `obj` to the span's record.
+
+        Returns
+        -------
+        obj
+        """
+        if self.record is not None:
+            self.record["dask_tasks"] = _dask_tasks(obj)
+        return obj
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.record is None:
+            return False
+        wall_time = time.perf_counter() - self._start
+        read, written = _io_counters()
+        peak_rss = _peak_rss()
+        _local.stack.remove(self)
+        self.record.update(
+            {
+                "wall_time": wall_time,
+                "peak_rss": peak_rss,
+                "peak_rss_increase": _difference(peak_rss, self._peak_rss),
+                "bytes_read": _difference(read, self._read),
+                "bytes_written": _difference(written, self._written),
+                "error": None if exc_type is None else repr(exc_value),
+            }
+        )
+        self.record.update(self.info)
+        for callback in list(callbacks):
+            callback(self.record)
+        return False
+
+
+class span_recorder:
+    """Collect records of all spans finished while active.
+
+    Example
+    -------
+    To write a JSON report of a time axis check::
+
+        import pyhomogenize as pyh
+
+        with pyh.span_recorder() as recorder:
+            pyh.time_control('input.nc').check_timestamps(output='out.nc')
+        recorder.to_json('report.json')
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def __call__(self, record):
+        self.spans.append(record)
+
+    def __enter__(self):
+        add_span_callback(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        remove_span_callback(self)
+        return False
+
+    def summary(self):
+        """Total wall time and number of spans per stage."""
+        summary = {}
+        for record in self.spans:
+            stage = {"count": 0, "wall_time": 0.0}
+            stage = summary.setdefault(record["name"], stage)
+            stage["count"] += 1
+            stage["wall_time"] += record["wall_time"]
+        return summary
+
+    def to_json(self, output=None):
+        """Convert records to JSON.
+
+        Parameters
+        ----------
+        output: str, optional
+            Write JSON report on disk.
+
+        Returns
+        -------
+        str
+        """
+        report = json.dumps(
+            {"spans": self.spans, "summary": self.summary()},
+            indent=2,
+            default=str,
+        )
+        if output:
+            with open(output, "w") as f:
+                f.write(report)
+        return report
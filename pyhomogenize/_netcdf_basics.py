@@ -1,7 +1,12 @@
+from functools import partial
+
 import xarray as xr
 
+from . import _read_write as read_write
 from ._basics import basics
-from ._read_write import get_var_name, open_xrdataset, save_xrdataset
+from ._instrumentation import span
+from ._scheduler import scheduler_context
+from ._utilities import lazy_attribute, reset_lazy_attributes
 
 
 class netcdf_basics(basics):
@@ -13,27 +18,90 @@ class netcdf_basics(basics):
     ----------
     files: str or list
         file on disk or xarray.Dataset or list of both
+    mode: {'full', 'time'}, default: 'full'
+        `full`: Open all variables of files on disk.
+        `time`: Open the time axis of files on disk only.
+        The files are re-opened with all variables
+        as soon as the data is needed.
+    cache: str or time_axis_cache, optional
+        Cache of time axes used by mode `time`. See ``open_time_axis``.
+    scheduler: {'threads', 'processes', 'synchronous', 'distributed'}, optional
+        dask scheduler used to open, compute and write `ds`.
+        See ``scheduler_context``.
+    workers: int, optional
+        Number of dask workers. See ``scheduler_context``.
+    memory_limit: int or float or str, optional
+        Memory budget in MB or string like '4GB' driving the dask chunks
+        of `ds` and the memory of distributed workers.
+        See ``scheduler_context``.
+    priority: {'first', 'last'}, optional
+        Concatenate a list of xr.Datasets without overlapping time steps.
+        `first`: Datasets listed first win overlapping time steps.
+        `last`: Datasets listed last win overlapping time steps.
+        If None concatenate all time steps. See ``concat_datasets``.
+
+    Notes
+    -----
+    `files` are kept as given. Files on disk selected by
+    `prune_files` are written to `opened_files`.
+    `ds` is opened on first access. All attributes derived from `ds`
+    are computed on first access as well and are reset whenever `ds`
+    is replaced.
     """
 
-    def __init__(self, files, **kwargs):
+    def __init__(
+        self,
+        files,
+        mode="full",
+        cache=None,
+        scheduler=None,
+        workers=None,
+        memory_limit=None,
+        priority=None,
+        **kwargs,
+    ):
         basics.__init__(self, **kwargs)
         if isinstance(files, str):
             files = [files]
         self.files = self.files(files)
-        self.ds = self.ds()
-        self.name = self.name()
+        self.mode = mode
+        self.cache = cache
+        self.scheduler = scheduler
+        self.workers = workers
+        self.memory_limit = memory_limit
+        self.priority = priority
+        self.pruning = None
+        self.opened_files = None
+        self.overlaps = None
+        self._ds = None
 
     def files(self, files):
         """List of input netCDF file(s) and/or xr.Dataset(s)."""
         return files
 
+    @property
     def ds(self):
         """Input netCDF file(s) openend as xr.Dataset(s). See method open"""
-        return self.open()
+        if self._ds is None:
+            self._ds = self.open()
+        return self._ds
+
+    @ds.setter
+    def ds(self, ds):
+        self._ds = ds
+        reset_lazy_attributes(self)
+
+    @lazy_attribute
+    def roles(self):
+        """CF roles of the variables of `ds`. See method classify_variables"""
+        return read_write.classify_variables(self.ds)
 
+    @lazy_attribute
     def name(self):
         """CF variable name of `ds`. See method get_var_name"""
-        return get_var_name(self.ds)
+        if self.mode == "time" and "CF_variables" in self.ds.attrs:
+            return self.ds.attrs["CF_variables"]
+        return self.roles["data_vars"]
 
     def _add_to_attrs(self, target, attr_name, value):
         """Adds or updates attribute
@@ -61,6 +129,7 @@ class netcdf_basics(basics):
         attr_name: str
             Name of the attribute which will be added or updated
         """
+        self._require_data()
         var_name = self.name
         if isinstance(indexes, list):
             indexes = str(indexes)
@@ -78,29 +147,141 @@ class netcdf_basics(basics):
         attr_name: str
             Name of the attribute which will be added or updated
         """
+        self._require_data()
         if isinstance(indexes, list):
             indexes = str(indexes)
         if indexes:
             self._add_to_attrs(self.ds, attr_name, indexes)
 
-    def open(self):
+    def open(self, mode=None):
         """Opens file or list of files on disk.
         Result is automaticaly wrote to object's attributes.
+
+        Parameters
+        ----------
+        mode: {'full', 'time'}, optional
+            `full`: Open all variables of files on disk.
+            `time`: Open the time axis of files on disk only.
+            Default is the object's mode.
         """
-        if isinstance(self.files, xr.Dataset):
-            return self.files
-        elif isinstance(self.files, str):
-            return open_xrdataset(self.files)
-        elif isinstance(self.files, list):
-            if all(isinstance(x, (xr.Dataset)) for x in self.files):
-                return xr.concat(self.files, dim="time")
-            elif all(isinstance(x, (str)) for x in self.files):
-                return open_xrdataset(self.files)
+        if not mode:
+            mode = self.mode
+        if mode == "time":
+            opener = partial(read_write.open_time_axis, cache=self.cache)
+        else:
+            opener = partial(
+                read_write.open_xrdataset,
+                scheduler=self.scheduler,
+                workers=self.workers,
+                memory_limit=self.memory_limit,
+            )
+        files = self.files
+        if self.opened_files is not None:
+            files = self.opened_files
+        if isinstance(files, xr.Dataset):
+            return files
+        elif isinstance(files, str):
+            return opener(files)
+        elif isinstance(files, list):
+            if all(isinstance(x, (xr.Dataset)) for x in files):
+                return self._concat()
+            elif all(isinstance(x, (str)) for x in files):
+                return opener(files)
         raise ValueError(
             "Input files are not xarray Datasets or files on disk."
             "You can not mix those two types."
         )
 
+    def _concat(self):
+        """Concatenate list of xr.Datasets along time.
+
+        If the object's `priority` is set, overlapping time steps are
+        dropped before concatenating. Statistics are written to the
+        object's attribute `overlaps`.
+        """
+        with span("open", mode="concat", priority=self.priority) as stage:
+            if self.priority is None:
+                return stage.tasks(xr.concat(self.files, dim="time"))
+            ds, dropped = read_write.concat_datasets(
+                self.files,
+                priority=self.priority,
+            )
+            self.overlaps = {"datasets": len(self.files), "dropped": dropped}
+            stage.info.update(self.overlaps)
+            return stage.tasks(ds)
+
+    def prune_files(self, time_range):
+        """Drop files on disk not overlapping a time range before
+        they are opened with all variables.
+
+        Each file's time axis is read from its header or from the
+        object's cache. See ``select_files``.
+        Selected files are written to the object's attribute
+        `opened_files`; `files` is kept as given.
+        Statistics are written to the object's attribute `pruning`.
+
+        Parameters
+        ----------
+        time_range: list
+            List of two strings or ``cftime.datetime`` objects
+            representing the left and right time bounds
+
+        Returns
+        -------
+        self
+        """
+        if self._ds is not None and self.mode != "time":
+            return self
+        if not isinstance(self.files, list) or len(self.files) < 2:
+            return self
+        if not all(isinstance(x, str) for x in self.files):
+            return self
+        with span("prune") as stage:
+            selected = read_write.select_files(
+                self.files,
+                time_range,
+                cache=self.cache,
+            )
+            if not selected:
+                selected = self.files[:1]
+            self.pruning = {
+                "files": len(self.files),
+                "opened": len(selected),
+                "pruned": len(self.files) - len(selected),
+            }
+            stage.info.update(self.pruning)
+        if len(selected) < len(self.files):
+            self.opened_files = selected
+            self.ds = None
+        return self
+
+    def _require_data(self):
+        """Re-open files on disk with all variables if only
+        the time axis is opened.
+        """
+        if self.mode != "time":
+            return
+        self.mode = "full"
+        self.ds = None
+
+    def compute(self):
+        """Load `self.ds` into memory using the object's dask scheduler.
+
+        Returns
+        -------
+        self
+        """
+        self._require_data()
+        with scheduler_context(
+            self.scheduler,
+            self.workers,
+            self.memory_limit,
+        ):
+            with span("compute") as stage:
+                stage.tasks(self.ds)
+                self.ds = self.ds.load()
+        return self
+
     def write(self, output=None, **kwargs):
         """Writes `self.ds` or user-given xr.Dataset as netCDF file on disk.
 
@@ -108,6 +289,10 @@ class netcdf_basics(basics):
         ----------
         output: str, optional
             Name of the output netCDF file
+        kwargs:
+            Optional parameters transferred to function
+            ``save_xrdataset``. `scheduler`, `workers` and
+            `memory_limit` default to the object's ones.
 
         Returns
         -------
@@ -120,5 +305,8 @@ class netcdf_basics(basics):
         if not output:
             print("No output selected.")
         else:
-            save_xrdataset(self.ds, output, **kwargs)
+            kwargs.setdefault("scheduler", self.scheduler)
+            kwargs.setdefault("workers", self.workers)
+            kwargs.setdefault("memory_limit", self.memory_limit)
+            read_write.save_xrdataset(self.ds, output, **kwargs)
         return self
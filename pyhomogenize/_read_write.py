@@ -1,21 +1,43 @@
 # flake8: noqa: E501
 
+import glob
+import math
+import os
+import tempfile
+import zipfile
+
+import numpy as np
 import xarray as xr
 
+from ._cache import get_cache
+from ._instrumentation import span
+from ._scheduler import get_chunk_size, scheduler_context, uses_processes
+
+cf_roles = ["data_vars", "bounds", "auxiliary_coords", "ancillary"]
+
+# Dimensions of boundary variables and cell vertices.
+bounds_dims = ["bnds", "bounds", "nb2", "nv", "nv4", "nvertex", "vertices"]
+
 
 def open_xrdataset(
     files,
     use_cftime=True,
     parallel=True,
     data_vars="minimal",
-    chunks={"time": 1},
+    chunks="disk",
     coords="minimal",
     compat="override",
+    size_opt=128,
+    scheduler=None,
+    workers=None,
+    memory_limit=None,
     **kwargs,
 ):
     """Optimized function for opening large cf datasets.
 
     based on [open_xrdataset]_.
+    Zarr stores (directories or zip files; see `is_zarr`)
+    are opened with the zarr engine and combined by coordinates.
     decode_timedelta=False is added to leave variables and
     coordinates with time units in
     {“days”, “hours”, “minutes”, “seconds”, “milliseconds”, “microseconds”}
@@ -25,18 +47,31 @@ def open_xrdataset(
     ----------
     files: str or list
         See [open_mfdataset]_
+        netCDF files or Zarr stores.
     use_cftime: bool, optional
         See [decode_cf]_
     parallel: bool, optional
         See [open_mfdataset]_
     data_vars: {"minimal", "different", "all"} or list of str, optional
         See [open_mfdataset]
-    chunks: int or dict, optional
+    chunks: int or dict or "disk", optional
         See [open_mfdataset]
+        If "disk" call `get_disk_chunks` for the first file.
     coords: {"minimal", "different", "all"} or list of str, optional
         See [open_mfdataset]
     compat: str (see `coords`), optional
         See [open_mfdataset]
+    size_opt: int, optional
+        Optimum size per chunk in MB if `chunks` is "disk".
+    scheduler: str, optional
+        dask scheduler opening `files` in parallel.
+        See `scheduler_context`.
+    workers: int, optional
+        Number of dask workers. See `scheduler_context`.
+    memory_limit: int or float or str, optional
+        Memory budget in MB or string like '4GB'.
+        If `chunks` is "disk" `size_opt` is reduced to keep the budget.
+        Default is the memory limit of the active `scheduler_context`.
 
     Returns
     -------
@@ -53,25 +88,424 @@ def open_xrdataset(
     def drop_all_coords(ds):
         return ds.reset_coords(drop=True)
 
-    ds = xr.open_mfdataset(
-        files,
-        parallel=parallel,
-        decode_times=False,
-        combine="by_coords",
-        preprocess=drop_all_coords,
-        decode_cf=False,
-        chunks=chunks,
-        data_vars=data_vars,
-        coords=coords,
-        compat=compat,
-        **kwargs,
-    )
+    with span("open", mode="full") as stage, scheduler_context(
+        scheduler, workers, memory_limit
+    ):
+        if chunks == "disk":
+            size_opt = min(size_opt, get_chunk_size() or size_opt)
+            chunks = get_disk_chunks(_first_file(files), size_opt=size_opt)
+        if all(is_zarr(file) for file in _expand_files(files)):
+            datasets = [
+                drop_all_coords(
+                    _open_dataset(
+                        file,
+                        decode_times=False,
+                        decode_cf=False,
+                        chunks=chunks,
+                        **kwargs,
+                    )
+                )
+                for file in _expand_files(files)
+            ]
+            ds = xr.combine_by_coords(
+                datasets,
+                data_vars=data_vars,
+                coords=coords,
+                compat=compat,
+                combine_attrs="override",
+            )
+        else:
+            ds = xr.open_mfdataset(
+                files,
+                parallel=parallel,
+                decode_times=False,
+                combine="by_coords",
+                preprocess=drop_all_coords,
+                decode_cf=False,
+                chunks=chunks,
+                data_vars=data_vars,
+                coords=coords,
+                compat=compat,
+                **kwargs,
+            )
+        stage.tasks(ds)
     if isinstance(files, list):
         files = ",  ".join(map(str, files))
-    for var in get_var_name(ds):
+    ds.encoding["cf_variables"] = (_signature(ds), classify_variables(ds))
+    names = get_var_name(ds)
+    for var in names:
         ds[var].attrs["associated_files"] = files
-    ds.attrs["CF_variables"] = get_var_name(ds)
-    return xr.decode_cf(ds, use_cftime=use_cftime, decode_timedelta=False)
+    ds.attrs["CF_variables"] = names
+    with span("decode") as stage:
+        return stage.tasks(
+            xr.decode_cf(ds, use_cftime=use_cftime, decode_timedelta=False)
+        )
+
+
+def open_time_axis(files, use_cftime=True, cache=None, **kwargs):
+    """Open the time axis of netCDF file(s) without reading any data.
+
+    Only the time variable, its attributes and the global attributes
+    are read from each file header. The CF variables of each file are
+    written to the global attribute `CF_variables`. The CF roles of all
+    variables are cached in the dataset's encoding.
+    See `classify_variables`.
+    No data variables are read and no dask graph is built.
+    Time axes of unchanged files are read from `cache` if available.
+    Zarr stores are never cached.
+
+    Parameters
+    ----------
+    files: str or list
+        netCDF file(s) or Zarr store(s) on disk
+    use_cftime: bool, optional
+        See [decode_cf]_
+    cache: str or time_axis_cache, optional
+        Cache directory or ``time_axis_cache`` object.
+        Default is the environment variable `PYHOMOGENIZE_CACHE_DIR`.
+        If neither is set do not use any cache.
+    kwargs:
+        Optional parameters transferred to function [open_dataset]_
+
+    Returns
+    -------
+    xarray.Dataset
+        Dataset containing time coordinate only.
+
+    References
+    ----------
+    .. [decode_cf] https://docs.xarray.dev/en/stable/generated/xarray.decode_cf.html
+    .. [open_dataset] https://docs.xarray.dev/en/stable/generated/xarray.open_dataset.html
+
+    """
+    cache = get_cache(cache)
+    with span("open", mode="time", cache=cache is not None):
+        segments = []
+        roles = {role: [] for role in cf_roles}
+        for file in _expand_files(files):
+            segment, variables = _time_segment(file, use_cftime, cache, **kwargs)
+            for role, names in variables.items():
+                roles[role] += [var for var in names if var not in roles[role]]
+            segments += [segment]
+        segments = sorted(
+            segments,
+            key=lambda segment: segment.time.values[:1].tolist(),
+        )
+        ds = xr.concat(segments, dim="time", combine_attrs="override")
+        ds.attrs["CF_variables"] = list(roles["data_vars"])
+        ds.encoding["cf_variables"] = (_signature(ds), roles)
+        return ds
+
+
+def _time_segment(file, use_cftime=True, cache=None, **kwargs):
+    """Decoded time axis and CF roles of all variables of a single file.
+    See `open_time_axis`.
+    """
+    cached = None
+    if cache is not None and not is_zarr(file):
+        cached = cache.get(file)
+    if cached is None:
+        with _open_dataset(
+            file,
+            decode_cf=False,
+            decode_times=False,
+            chunks=None,
+            **kwargs,
+        ) as ds:
+            variables = classify_variables(ds)
+            segment = ds[["time"]].load()
+        if cache is not None and not is_zarr(file):
+            cache.put(file, segment, variables)
+    else:
+        segment, variables = cached
+        if isinstance(variables, list):
+            variables = {"data_vars": variables}
+    segment = xr.decode_cf(segment, use_cftime=use_cftime, decode_timedelta=False)
+    return segment, variables
+
+
+def _runs(sources, positions):
+    """Runs of consecutive positions within the same source.
+
+    Returns
+    -------
+    list
+        List of pairs of source and slice of positions.
+    """
+    breaks = (np.diff(sources) != 0) | (np.diff(positions) != 1)
+    starts = np.concatenate([[0], np.flatnonzero(breaks) + 1])
+    ends = np.concatenate([starts[1:], [len(sources)]])
+    return [
+        (sources[start], slice(positions[start], positions[end - 1] + 1))
+        for start, end in zip(starts, ends)
+    ]
+
+
+def concat_datasets(datasets, priority="first"):
+    """Concatenate datasets along time without overlapping time steps.
+
+    The time steps of each dataset are compared with the time steps of
+    all datasets of higher priority up front. Time steps already
+    available are dropped. Time steps filling gaps of datasets of
+    higher priority are kept. The remaining time steps are sorted and
+    selected as runs of consecutive time steps by slicing, so
+    duplicated data is never copied.
+
+    Parameters
+    ----------
+    datasets: list
+        List of xr.Dataset(s) each with a monotonic increasing time axis.
+    priority: {'first', 'last'}, default: 'first'
+        `first`: Datasets listed first win overlapping time steps.
+        `last`: Datasets listed last win overlapping time steps.
+
+    Returns
+    -------
+    tuple
+        Concatenated xr.Dataset and number of dropped time steps.
+        Datasets without monotonic increasing or comparable time axes
+        are concatenated without dropping any time steps.
+    """
+    if priority not in ["first", "last"]:
+        raise ValueError(
+            "Priority {} is not available. Use 'first' or 'last'.".format(priority)
+        )
+    indexes = [ds.indexes["time"] for ds in datasets]
+    if not all(index.is_monotonic_increasing for index in indexes):
+        return xr.concat(datasets, dim="time"), 0
+    order = list(range(len(datasets)))
+    if priority == "last":
+        order = order[::-1]
+    times, sources, positions = [], [], []
+    covered = None
+    try:
+        for i in order:
+            index = indexes[i]
+            keep = np.ones(len(index), dtype=bool)
+            if covered is not None:
+                keep = ~index.isin(covered)
+            covered = index if covered is None else covered.append(index)
+            kept = np.flatnonzero(keep)
+            times += [np.asarray(index)[kept]]
+            sources += [np.full(len(kept), i)]
+            positions += [kept]
+        times = np.concatenate(times)
+        sort_order = np.argsort(times, kind="stable")
+    except TypeError:
+        return xr.concat(datasets, dim="time"), 0
+    if not len(sort_order):
+        return xr.concat(datasets, dim="time"), 0
+    runs = _runs(
+        np.concatenate(sources)[sort_order],
+        np.concatenate(positions)[sort_order],
+    )
+    ds = xr.concat(
+        [datasets[source].isel(time=part) for source, part in runs],
+        dim="time",
+    )
+    dropped = sum(len(index) for index in indexes) - ds.sizes["time"]
+    return ds, dropped
+
+
+def select_files(files, time_range, use_cftime=True, cache=None, **kwargs):
+    """Select files overlapping a time range.
+
+    Each file's time axis is read from its header or from `cache`.
+    No data variables are read. Files whose time axis can not be
+    sliced, e.g. non-monotonic time axes, are always selected.
+
+    Parameters
+    ----------
+    files: str or list
+        netCDF file(s) or Zarr store(s) on disk
+    time_range: list
+        List of two strings or ``cftime.datetime`` objects representing
+        the left and right time bounds. See [sel]_
+    use_cftime: bool, optional
+        See [decode_cf]_
+    cache: str or time_axis_cache, optional
+        Cache directory or ``time_axis_cache`` object.
+        See `open_time_axis`.
+    kwargs:
+        Optional parameters transferred to function [open_dataset]_
+
+    Returns
+    -------
+    list
+        Files overlapping `time_range`.
+
+    References
+    ----------
+    .. [sel] https://docs.xarray.dev/en/stable/generated/xarray.Dataset.sel.html
+    .. [decode_cf] https://docs.xarray.dev/en/stable/generated/xarray.decode_cf.html
+    .. [open_dataset] https://docs.xarray.dev/en/stable/generated/xarray.open_dataset.html
+
+    """
+    start, end = time_range
+    cache = get_cache(cache)
+    selected = []
+    for file in _expand_files(files):
+        segment, _ = _time_segment(file, use_cftime, cache, **kwargs)
+        try:
+            overlap = segment.time.sel(time=slice(start, end)).size
+        except (KeyError, ValueError, TypeError):
+            overlap = True
+        if overlap:
+            selected += [file]
+    return selected
+
+
+def _expand_files(files):
+    """List of files of a file, a glob string or a list of files."""
+    if isinstance(files, (list, tuple)):
+        return list(files)
+    matches = sorted(glob.glob(str(files)))
+    if matches:
+        return matches
+    return [files]
+
+
+def _first_file(files):
+    """First file of a file, a glob string or a list of files."""
+    return _expand_files(files)[0]
+
+
+def is_zarr(file):
+    """Check whether `file` is a Zarr store.
+
+    Zarr stores are directories with extension `.zarr`
+    or zip files with extension `.zip`.
+
+    Parameters
+    ----------
+    file: str
+        Path of the store.
+
+    Returns
+    -------
+    bool
+    """
+    if not isinstance(file, (str, os.PathLike)):
+        return False
+    return str(file).rstrip("/").endswith((".zarr", ".zip"))
+
+
+def _zarr_store(file):
+    """Zarr store of a directory or a zip file opened for reading."""
+    if str(file).endswith(".zip"):
+        import zarr
+
+        return zarr.storage.ZipStore(file, mode="r")
+    return file
+
+
+def _zip_directory(directory, name):
+    """Write all files of `directory` uncompressed to zip file `name`."""
+    with zipfile.ZipFile(name, "w", zipfile.ZIP_STORED) as zf:
+        for root, _, files in os.walk(directory):
+            for file in sorted(files):
+                path = os.path.join(root, file)
+                zf.write(path, os.path.relpath(path, directory))
+
+
+def _open_dataset(file, **kwargs):
+    """Open netCDF file or Zarr store. See [open_dataset]_"""
+    if is_zarr(file):
+        return xr.open_dataset(_zarr_store(file), engine="zarr", **kwargs)
+    return xr.open_dataset(file, **kwargs)
+
+
+def _chunk_length(
+    sizes,
+    chunk_var="time",
+    size_opt=128,
+    itemsize=4,
+    multiple=1,
+):
+    """Get chunk length of dimension `chunk_var`.
+
+    Chunks span all other dimensions completely. The chunk length
+    is a multiple of `multiple` and chunks are of size `size_opt`
+    at most unless a single multiple exceeds `size_opt`.
+
+    Parameters
+    ----------
+    sizes: dict
+        Dimension names and lengths.
+    chunk_var: str, optional
+        Calculate chunk length for dimension name.
+    size_opt: int, optional
+        Optimum size per chunk in MB.
+    itemsize: int, optional
+        Size of a single array element in bytes.
+    multiple: int, optional
+        Chunk length is a multiple of `multiple`.
+
+    Returns
+    -------
+    int
+    """
+    size = itemsize / 1024**2
+    for dim, length in sizes.items():
+        if dim != chunk_var:
+            size *= length
+    length = int(size_opt / size) // multiple * multiple
+    return min(sizes[chunk_var], max(length, multiple, 1))
+
+
+def get_disk_chunks(file, chunk_var="time", size_opt=128):
+    """Get dask chunks aligned with the on-disk chunk layout.
+
+    Read the HDF5 or Zarr chunk layout and the data type of
+    each CF variable from the file header. Dask chunks span all dimensions except
+    `chunk_var` completely. The chunk length of `chunk_var` is a
+    multiple of the on-disk chunk length next to `size_opt`.
+    See `get_chunksizes` for the write side.
+
+    Parameters
+    ----------
+    file: str
+        netCDF file or Zarr store on disk.
+    chunk_var: str, optional
+        Calculate chunk length for dimension name.
+    size_opt: int, optional
+        Optiumum size per chunk in MB.
+
+    Returns
+    -------
+    dict
+        Dask chunks for each dimension.
+    """
+    with _open_dataset(
+        file,
+        decode_cf=False,
+        decode_times=False,
+        chunks=None,
+    ) as ds:
+        lengths = []
+        multiple = 1
+        for var in get_var_name(ds):
+            da = ds[var]
+            if chunk_var not in da.dims:
+                continue
+            disk_chunks = da.encoding.get("chunksizes") or da.encoding.get("chunks")
+            var_multiple = 1
+            if disk_chunks:
+                var_multiple = dict(zip(da.dims, disk_chunks))[chunk_var]
+            multiple = multiple * var_multiple // math.gcd(multiple, var_multiple)
+            lengths += [
+                _chunk_length(
+                    dict(da.sizes),
+                    chunk_var=chunk_var,
+                    size_opt=size_opt,
+                    itemsize=da.dtype.itemsize,
+                    multiple=var_multiple,
+                )
+            ]
+        chunks = {dim: -1 for dim in ds.dims}
+    if lengths:
+        chunks[chunk_var] = max(min(lengths) // multiple * multiple, multiple)
+    return chunks
 
 
 def get_chunksizes(
@@ -106,29 +540,113 @@ def get_chunksizes(
     if chunks is None:
         chunks = da.chunk().chunks
     dims = da.dims
-    size = 1
     chunk_dict = {}
     for dim, chunk in dict(zip(dims, chunks)).items():
         if isinstance(chunk, tuple):
             chunk_size = sum(chunk)
         else:
             chunk_size = chunk
-        if dim != chunk_var:
-            size *= chunk_size
         chunk_dict[dim] = chunk_size
-    size_act = size * bit_precision / 8 / 1024**2
-    chunk_dict[chunk_var] = min(
-        chunk_dict[chunk_var],
-        int(size_opt / size_act),
+    chunk_dict[chunk_var] = _chunk_length(
+        chunk_dict,
+        chunk_var=chunk_var,
+        size_opt=size_opt,
+        itemsize=bit_precision / 8,
     )
     return tuple(chunk_dict.values())
 
 
+def get_compression_filters():
+    """Get compression filters available in the netCDF4 backend.
+
+    Returns
+    -------
+    list
+        Names of compression filters. zlib is always available.
+    """
+    filters = ["zlib"]
+    try:
+        import netCDF4
+    except ImportError:
+        return filters
+    supported = {
+        "zstandard": ["zstd"],
+        "bzip2": ["bzip2"],
+        "szip": ["szip"],
+        "blosc": [
+            "blosc_lz",
+            "blosc_lz4",
+            "blosc_lz4hc",
+            "blosc_zlib",
+            "blosc_zstd",
+        ],
+    }
+    for name, names in supported.items():
+        if getattr(netCDF4, "__has_{}_support__".format(name), False):
+            filters += names
+    return filters
+
+
+def _inherited_compression(da):
+    """Get compression settings from the on-disk encoding of `da`."""
+    encoding = da.encoding
+    settings = {}
+    for name in ["zstd", "bzip2"]:
+        if encoding.get(name):
+            settings["compression"] = name
+    blosc = encoding.get("blosc")
+    if isinstance(blosc, dict):
+        settings["compression"] = blosc.get("compressor", "blosc_lz4")
+        settings["blosc_shuffle"] = blosc.get("shuffle", 1)
+    szip = encoding.get("szip")
+    if isinstance(szip, dict):
+        settings["compression"] = "szip"
+        settings["szip_coding"] = szip.get("coding", "nn")
+        settings["szip_pixels_per_block"] = szip.get("pixels_per_block", 8)
+    for key in [
+        "zlib",
+        "complevel",
+        "shuffle",
+        "fletcher32",
+        "least_significant_digit",
+    ]:
+        if key in encoding:
+            settings[key] = encoding[key]
+    return settings
+
+
+def _compression(da, compression, complevel, shuffle):
+    """Get compression settings for `da`. See `get_encoding`."""
+    if compression == "inherit":
+        settings = _inherited_compression(da)
+    elif not compression:
+        return {"zlib": False}
+    elif compression not in get_compression_filters():
+        print("Compression filter {} is not available. Use zlib.".format(compression))
+        settings = {"zlib": True, "complevel": 4, "shuffle": True}
+    elif compression == "zlib":
+        settings = {"zlib": True, "complevel": 4, "shuffle": True}
+    else:
+        settings = {"compression": compression, "complevel": 4}
+        if compression != "szip":
+            settings["shuffle"] = True
+    if complevel is not None:
+        settings["complevel"] = complevel
+    if shuffle is not None:
+        settings["shuffle"] = shuffle
+    return settings
+
+
 def get_encoding(
     ds,
     encoding={},
     MISSVAL=1e20,
     chunk_dict={},
+    compression="inherit",
+    complevel=None,
+    shuffle=None,
+    significant_digits=None,
+    quantize_mode="BitGroom",
 ):
     """Get encoding for each CF variable in dataset.
 
@@ -137,21 +655,51 @@ def get_encoding(
     ds: xr.Dataset
         Dataset containing CF variables.
     encoding: dict
-        Encoding dictionary
+        Encoding dictionary. Its settings take precedence.
     MISSVAL: float, optional
         Missing value.
     chunk_dict: dict or None, optional
         Dictionary with parameters for `get_chunksizes`.
         If None do not chunk dimension.
         If empty call `get_chunksizes` with default values.
+        `size_opt` is reduced to keep the memory limit of the active
+        `scheduler_context`. See `get_chunk_size`.
+    compression: str or None, default: 'inherit'
+        Compression filter, e.g. 'zlib', 'zstd', 'bzip2' or 'blosc_lz4'.
+        See `get_compression_filters`.
+        If 'inherit' use each variable's compression of the input file.
+        If None do not compress.
+    complevel: int, optional
+        Compression level between 1 and 9. Default is 4.
+    shuffle: bool, optional
+        Apply HDF5 shuffle filter before compressing.
+        Default is True if `compression` is set.
+    significant_digits: int, optional
+        Number of significant decimal digits to retain.
+        Lossy quantization of floating-point data improving compression.
+    quantize_mode: {'BitGroom', 'BitRound', 'GranularBitRound'}, optional
+        Quantization algorithm if `significant_digits` is set.
+        For 'BitRound' `significant_digits` are binary digits.
+
     Returns
     -------
     dict
         Encoding dictionary
     """
+    encoding = {var: dict(enc) for var, enc in encoding.items()}
+    if isinstance(chunk_dict, dict):
+        chunk_dict = dict(chunk_dict)
+        size_opt = get_chunk_size()
+        if size_opt:
+            size_opt = min(chunk_dict.get("size_opt", 128), size_opt)
+            chunk_dict["size_opt"] = size_opt
     for var in get_var_name(ds):
-        if not var in encoding.keys():
-            encoding[var] = {}
+        settings = _compression(ds[var], compression, complevel, shuffle)
+        if significant_digits is not None:
+            settings["significant_digits"] = significant_digits
+            settings["quantize_mode"] = quantize_mode
+        settings.update(encoding.get(var, {}))
+        encoding[var] = settings
         encoding[var]["_FillValue"] = MISSVAL
         encoding[var]["missing_value"] = MISSVAL
         if isinstance(chunk_dict, dict):
@@ -162,6 +710,119 @@ def get_encoding(
     return encoding
 
 
+def _zarr_chunks(length, chunk, offset=0):
+    """Dask chunks of `length` elements aligned with Zarr chunks
+    of `chunk` elements starting after `offset` elements.
+    """
+    chunks = []
+    first = min(-offset % chunk, length)
+    if first:
+        chunks += [first]
+    rest = length - first
+    chunks += [chunk] * (rest // chunk)
+    if rest % chunk:
+        chunks += [rest % chunk]
+    return tuple(chunks)
+
+
+def _save_zarr(ds, name, encoding, compute, append):
+    """Save dataset as Zarr store. See `save_xrdataset`.
+
+    Dask chunks are aligned with the Zarr chunks so that
+    each dask task writes whole Zarr chunks in parallel.
+    Zip files are written to a temporary directory store first.
+    """
+    if append and os.path.exists(name):
+        if str(name).endswith(".zip"):
+            print("Cannot append to zipped Zarr store {}.".format(name))
+            return
+        with _open_dataset(name, decode_cf=False, chunks=None) as store:
+            offset = store.sizes["time"]
+            layout = {
+                var: store[var].encoding.get("chunks")
+                for var in get_var_name(ds)
+                if var in store
+            }
+        for var, chunks in layout.items():
+            if not chunks or "time" not in ds[var].dims:
+                continue
+            chunks = dict(zip(ds[var].dims, chunks))
+            chunks["time"] = _zarr_chunks(
+                ds.sizes["time"],
+                chunks["time"],
+                offset=offset,
+            )
+            ds = ds.assign({var: ds[var].chunk(chunks)})
+        return ds.to_zarr(name, append_dim="time", compute=compute)
+    zarr_encoding = {}
+    for var, enc in encoding.items():
+        zarr_encoding[var] = {
+            key: enc[key]
+            for key in ["_FillValue", "missing_value", "dtype"]
+            if key in enc
+        }
+        chunks = enc.get("chunksizes")
+        if chunks:
+            zarr_encoding[var]["chunks"] = chunks
+            ds = ds.assign({var: ds[var].chunk(dict(zip(ds[var].dims, chunks)))})
+    if not str(name).endswith(".zip"):
+        return ds.to_zarr(
+            name,
+            mode="w",
+            encoding=zarr_encoding,
+            compute=compute,
+        )
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(name) or ".") as tmp:
+        ds.to_zarr(tmp, mode="w", encoding=zarr_encoding)
+        _zip_directory(tmp, name)
+
+
+def limit_chunks(ds, chunk_var="time", size_opt=None):
+    """Split dask chunks exceeding `size_opt` along `chunk_var`.
+
+    Each chunk is split into nearly equal parts so that no new chunk
+    depends on more than one existing chunk.
+
+    Parameters
+    ----------
+    ds: xr.Dataset
+        Dataset to be rechunked.
+    chunk_var: str, optional
+        Split chunks along dimension name.
+    size_opt: int or float, optional
+        Maximum size per chunk in MB.
+        Default is derived from the memory limit of the active
+        `scheduler_context`. See `get_chunk_size`.
+
+    Returns
+    -------
+    xr.Dataset
+    """
+    if size_opt is None:
+        size_opt = get_chunk_size()
+    if size_opt is None:
+        return ds
+    for var, da in ds.data_vars.items():
+        if da.chunks is None or chunk_var not in da.dims:
+            continue
+        length = _chunk_length(
+            dict(da.sizes),
+            chunk_var=chunk_var,
+            size_opt=size_opt,
+            itemsize=da.dtype.itemsize,
+        )
+        chunks = da.chunksizes[chunk_var]
+        if max(chunks) <= length:
+            continue
+        split = []
+        for chunk in chunks:
+            parts = -(-chunk // length)
+            split += [chunk // parts + 1] * (chunk % parts)
+            split += [chunk // parts] * (parts - chunk % parts)
+        ds = ds.assign({var: da.chunk({chunk_var: tuple(split)})})
+    return ds
+
+
 def save_xrdataset(
     ds,
     name=None,
@@ -169,19 +830,30 @@ def save_xrdataset(
     format="NETCDF4",
     unlimited_dims={"time": True},
     compute=True,
+    append=False,
+    scheduler=None,
+    workers=None,
+    memory_limit=None,
 ):
-    """Save dataset as netCDF file.
+    """Save dataset as netCDF file or Zarr store.
+
+    The format is chosen by the extension of `name`.
+    Zarr stores (see `is_zarr`) are written with dask chunks aligned
+    to the Zarr chunks so that dask workers write chunks in parallel.
+    Zarr stores use the default compressor of the zarr library.
 
     Parameters
     ----------
     ds: xr.Dataset
         Dataset to save on disk.
     name: str, optional
-        name of the netcdf output file
+        name of the netcdf output file or Zarr store
     encoding_dict: dict or None, optional
         Encoding dictionary for `get_encoding`.
-        If dict call `get_encoding` with dict values as parameters.
-        If empty call `get_encoding` with default values.
+        If dict call `get_encoding` with dict values as parameters,
+        e.g. {'compression': 'zstd', 'complevel': 4}.
+        If empty call `get_encoding` with default values,
+        inheriting the compression of the input file.
         If None encoding = {}.
     format: str, optional
         File format for the resulting netCDF file
@@ -191,6 +863,22 @@ def save_xrdataset(
     compute: bool, optional
         If true compute immediately, otherwise return a
         `dask.delayed.Delayed` object that can be computed later.
+        Zipped Zarr stores are always computed immediately.
+    append: bool, default: False
+        Append `ds` along time to an existing Zarr directory store.
+        Encoding and chunk layout of the store are kept.
+        If the store does not exist yet it is created.
+    scheduler: str, optional
+        dask scheduler computing and writing `ds`.
+        See `scheduler_context`. netCDF files are written
+        with `threads` instead of `processes`.
+    workers: int, optional
+        Number of dask workers. See `scheduler_context`.
+    memory_limit: int or float or str, optional
+        Memory budget in MB or string like '4GB'.
+        dask chunks exceeding the budget are split along time
+        before they are streamed to disk. See `limit_chunks`.
+        Default is the memory limit of the active `scheduler_context`.
 
     Returns
     -------
@@ -198,24 +886,125 @@ def save_xrdataset(
         * ``dask.delayed.Delayed`` if compute is False
         * None otherwise
     """
-    if isinstance(encoding_dict, dict):
-        encoding = get_encoding(
-            ds,
-            **encoding_dict,
+    if append and not is_zarr(name):
+        print("Appending along time is only available for Zarr stores.")
+        return
+    if not is_zarr(name) and uses_processes(scheduler):
+        print("netCDF files can not be written by processes. Use threads.")
+        scheduler = "threads"
+    with span("write", output=name) as stage, scheduler_context(
+        scheduler, workers, memory_limit
+    ):
+        ds = limit_chunks(ds)
+        if isinstance(encoding_dict, dict):
+            encoding = get_encoding(
+                ds,
+                **encoding_dict,
+            )
+        elif encoding_dict is None:
+            encoding = {}
+        stage.tasks(ds)
+        if is_zarr(name):
+            return _save_zarr(ds, name, encoding, compute, append)
+        return ds.to_netcdf(
+            name,
+            encoding=encoding,
+            format=format,
+            unlimited_dims=unlimited_dims,
+            compute=compute,
         )
-    elif encoding_dict is None:
-        encoding = {}
-    return ds.to_netcdf(
-        name,
-        encoding=encoding,
-        format=format,
-        unlimited_dims=unlimited_dims,
-        compute=compute,
-    )
+
+
+def _references(value):
+    """Variable names referenced by a CF attribute value,
+    e.g. 'lat lon' or 'area: cell_area'.
+    """
+    if not isinstance(value, str):
+        return []
+    return [name for name in value.split() if not name.endswith(":")]
+
+
+def _signature(ds):
+    """Names of all variables and dimensions of `ds`.
+    Variables themselves are not visited.
+    """
+    return tuple(ds.variables), tuple(ds.dims)
+
+
+def _copy_roles(roles):
+    """Copy of all lists of CF roles."""
+    return {role: list(names) for role, names in roles.items()}
+
+
+def classify_variables(ds):
+    """Classify variables of xr.Dataset by their CF roles.
+
+    Variables are classified from header metadata only: dimensions
+    and the CF attributes `coordinates`, `bounds`, `climatology`,
+    `grid_mapping`, `cell_measures` and `ancillary_variables`.
+    Unreferenced variables with a dimension listed in `bounds_dims`
+    are boundary variables unless no other data variables are left.
+    Remaining data variables with the most dimensions are CF variables.
+    CF roles cached in the dataset's encoding by `open_xrdataset` and
+    `open_time_axis` are reused as long as the names of the dataset's
+    variables and dimensions do not change. `ds` itself is never
+    modified.
+
+    Parameters
+    ----------
+    ds: xr.Dataset
+        xarray Dataset, encoded or decoded
+
+    Returns
+    -------
+    dict
+        Lists of variable names for the keys `data_vars` (CF variables),
+        `bounds` (boundary variables), `auxiliary_coords` (auxiliary
+        coordinate variables) and `ancillary` (grid mappings, cell
+        measures and ancillary variables).
+    """
+    cached = ds.encoding.get("cf_variables")
+    if cached and cached[0] == _signature(ds):
+        return _copy_roles(cached[1])
+    roles = {role: [] for role in cf_roles}
+    attributes = {
+        "coordinates": "auxiliary_coords",
+        "bounds": "bounds",
+        "climatology": "bounds",
+        "grid_mapping": "ancillary",
+        "cell_measures": "ancillary",
+        "ancillary_variables": "ancillary",
+    }
+    for name, var in ds.variables.items():
+        for attr, role in attributes.items():
+            value = var.attrs.get(attr, var.encoding.get(attr))
+            for ref in _references(value):
+                if ref in ds.variables and ref not in roles[role]:
+                    roles[role] += [ref]
+    for name in ds.coords:
+        if name not in ds.dims and name not in roles["auxiliary_coords"]:
+            roles["auxiliary_coords"] += [name]
+    referenced = set().union(*roles.values())
+    candidates = [
+        name for name in ds.data_vars if name not in referenced and name not in ds.dims
+    ]
+    bounds = [
+        name
+        for name in candidates
+        if set(ds.variables[name].dims).intersection(bounds_dims)
+    ]
+    if len(bounds) < len(candidates):
+        roles["bounds"] += bounds
+        candidates = [name for name in candidates if name not in bounds]
+    ndims = max([len(ds.variables[name].dims) for name in candidates] or [0])
+    roles["data_vars"] = [
+        name for name in candidates if len(ds.variables[name].dims) == ndims
+    ]
+    return roles
 
 
 def get_var_name(ds):
-    """List of CF variables in xr.Dataset
+    """List of CF variables in xr.Dataset. See `classify_variables`.
 
     Parameters
     ----------
@@ -225,27 +1014,15 @@ def get_var_name(ds):
     -------
     list
         List of CF variables
-    """
-
-    def condition(ds, var):
-        return len(ds[var].coords) == len(ds.coords)
 
-    def most_coords(ds):
-        coords = 0
-        name = []
-        for var in ds.data_vars:
-            ncoords = len(ds[var].coords)
-            if ncoords > coords:
-                coords = ncoords
-                name += [var]
-        return name
-
-    try:
-        var_list = [var for var in ds.data_vars if condition(ds, var)]
-        if var_list:
-            return var_list
-        return most_coords(ds)
-    except Exception:
-        if hasattr(ds, "name"):
-            return [ds.name]
-        raise ValueError("Coul not find any CF variables.")
+    Raises
+    ------
+    ValueError
+        If `ds` does not contain any CF variables.
+    """
+    if isinstance(ds, xr.DataArray):
+        return [ds.name]
+    names = classify_variables(ds)["data_vars"]
+    if not names:
+        raise ValueError("Could not find any CF variables.")
+    return names
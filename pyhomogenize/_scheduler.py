@@ -0,0 +1,278 @@
+"""Configuration of the dask scheduler used to open, compute and write
+datasets.
+
+Local distributed clusters are started on first use and shared
+by all datasets using the same number of workers and memory limit.
+A memory limit set by `scheduler_context` applies to all datasets
+opened and written within the context.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import os
+
+schedulers = ["threads", "processes", "synchronous", "distributed"]
+
+# Chunk-sized buffers held at the same time by a running task reading,
+# decoding, selecting and writing one chunk. See `get_chunk_size`.
+task_buffers = {
+    "read": 1,  # chunk read from disk
+    "chunk_cache": 1,  # HDF5 chunk cache limited to one chunk
+    "decode": 1,  # decoded and masked data
+    "select": 1,  # time steps selected from the chunk
+    "concatenate": 1,  # selections joined to an output chunk
+    "encode": 1,  # data encoded for writing
+    "compress": 1,  # HDF5 filter buffer while writing
+}
+buffers_per_task = sum(task_buffers.values())
+
+_clients = {}
+
+_memory_limit = contextvars.ContextVar("memory_limit", default=None)
+
+
+def _close_clients():
+    for client in _clients.values():
+        if client is None:
+            continue
+        client.close()
+        client.cluster.close()
+    _clients.clear()
+
+
+def _rss():
+    """Current resident set size of the process in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def parse_memory(memory_limit):
+    """Convert memory limit to bytes.
+
+    Parameters
+    ----------
+    memory_limit: int or float or str
+        Memory limit in MB or string like '4GB' or '512MiB'.
+
+    Returns
+    -------
+    int
+    """
+    if isinstance(memory_limit, str):
+        from dask.utils import parse_bytes
+
+        return parse_bytes(memory_limit)
+    return int(memory_limit * 1024**2)
+
+
+def get_memory_limit(memory_limit=None):
+    """Get memory limit in bytes.
+
+    Parameters
+    ----------
+    memory_limit: int or float or str, optional
+        See `parse_memory`.
+        Default is the memory limit of the active `scheduler_context`.
+
+    Returns
+    -------
+    int or None
+        None if no memory limit is set.
+    """
+    if memory_limit is None:
+        return _memory_limit.get()
+    return parse_memory(memory_limit)
+
+
+def get_workers(workers=None):
+    """Number of tasks running concurrently.
+    Default is the dask configuration or the number of cores.
+    """
+    if workers:
+        return workers
+    try:
+        import dask
+
+        workers = dask.config.get("num_workers", None)
+    except ImportError:
+        workers = None
+    return workers or os.cpu_count() or 1
+
+
+def get_chunk_size(memory_limit=None, workers=None):
+    """Optimum size per chunk in MB keeping a memory budget.
+
+    The memory not yet used by the process is shared by all `workers`,
+    each holding `buffers_per_task` chunks. Chunks are never smaller
+    than 1 MB, which is also used if the process already exceeds
+    the memory limit.
+
+    Parameters
+    ----------
+    memory_limit: int or float or str, optional
+        See `get_memory_limit`.
+    workers: int, optional
+        See `get_workers`.
+
+    Returns
+    -------
+    float or None
+        None if no memory limit is set.
+    """
+    memory_limit = get_memory_limit(memory_limit)
+    if memory_limit is None:
+        return
+    available = memory_limit - _rss()
+    if available <= 0:
+        print(
+            "Memory limit of {} MB is already used by the process.".format(
+                memory_limit // 1024**2
+            )
+        )
+        available = 0
+    tasks = get_workers(workers) * buffers_per_task
+    return max(available / tasks / 1024**2, 1)
+
+
+def get_client(workers=None, memory_limit=None):
+    """Get client of a local distributed cluster.
+
+    Parameters
+    ----------
+    workers: int, optional
+        Number of worker processes of the cluster.
+        Default is the number of cores.
+    memory_limit: int or float or str, optional
+        Memory limit shared by all workers. See `parse_memory`.
+
+    Returns
+    -------
+    distributed.Client or None
+        None if ``distributed`` is not installed.
+    """
+    key = (workers, memory_limit)
+    if key in _clients:
+        return _clients[key]
+    try:
+        from distributed import Client, LocalCluster
+    except ImportError:
+        print("Scheduler distributed is not available. Install distributed.")
+        _clients[key] = None
+        return
+    worker_memory = "auto"
+    if memory_limit is not None:
+        worker_memory = parse_memory(memory_limit) // get_workers(workers)
+    cluster = LocalCluster(
+        n_workers=workers,
+        threads_per_worker=1,
+        memory_limit=worker_memory,
+    )
+    if not any(_clients.values()):
+        atexit.register(_close_clients)
+    _clients[key] = Client(cluster, set_as_default=False)
+    return _clients[key]
+
+
+def uses_processes(scheduler=None):
+    """Whether `scheduler` or, if None, the configured dask scheduler
+    runs tasks in multiple local processes.
+    """
+    if scheduler is None:
+        import dask
+
+        scheduler = dask.config.get("scheduler", None)
+    return scheduler in ["processes", "multiprocessing"]
+
+
+@contextlib.contextmanager
+def scheduler_context(scheduler=None, workers=None, memory_limit=None):
+    """Context manager setting the dask scheduler.
+
+    Parameters
+    ----------
+    scheduler: {'threads', 'processes', 'synchronous', 'distributed'}, optional
+        dask scheduler. `distributed` starts a local distributed cluster.
+        If None and `workers` is None keep the dask configuration.
+        If None and `workers` is set use `threads`.
+    workers: int, optional
+        Number of threads, processes or distributed workers.
+        Default is the number of cores.
+    memory_limit: int or float or str, optional
+        Memory budget in MB or string like '4GB'.
+        Datasets opened and written within the context are chunked
+        to keep the budget. See `get_chunk_size`.
+        The HDF5 chunk cache is limited to the size of one chunk.
+        Distributed workers share the budget.
+
+    Example
+    -------
+    To check a netCDF file's time axis with four processes::
+
+        import pyhomogenize as pyh
+
+        with pyh.scheduler_context('processes', workers=4):
+            pyh.time_control('input.nc').check_timestamps(output='out.nc')
+    """
+    token = None
+    if memory_limit is not None:
+        token = _memory_limit.set(parse_memory(memory_limit))
+    try:
+        with _dask_config(scheduler, workers, memory_limit):
+            with _chunk_cache(get_chunk_size()):
+                yield
+    finally:
+        if token is not None:
+            _memory_limit.reset(token)
+
+
+@contextlib.contextmanager
+def _chunk_cache(size_opt=None):
+    """Limit the HDF5 chunk cache of netCDF variables opened
+    within the context to `size_opt` MB.
+    """
+    try:
+        import netCDF4
+    except ImportError:
+        netCDF4 = None
+    if size_opt is None or netCDF4 is None:
+        yield
+        return
+    size, nelems, preemption = netCDF4.get_chunk_cache()
+    netCDF4.set_chunk_cache(min(size, int(size_opt * 1024**2)))
+    try:
+        yield
+    finally:
+        netCDF4.set_chunk_cache(size, nelems, preemption)
+
+
+@contextlib.contextmanager
+def _dask_config(scheduler=None, workers=None, memory_limit=None):
+    """Set dask configuration. See `scheduler_context`."""
+    if scheduler is None and workers is None:
+        yield
+        return
+    import dask
+
+    if scheduler not in schedulers:
+        if scheduler is not None:
+            print(
+                "Scheduler {} is not available. Use one of {}.".format(
+                    scheduler, schedulers
+                )
+            )
+        scheduler = "threads"
+    config = {"scheduler": scheduler}
+    if scheduler == "distributed":
+        client = get_client(workers, memory_limit=memory_limit)
+        config = {"scheduler": "threads"}
+        if client is not None:
+            config = {"scheduler": client.get}
+    if workers and config["scheduler"] in ["threads", "processes"]:
+        config["num_workers"] = workers
+    with dask.config.set(config):
+        yield
@@ -1,5 +1,22 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from . import _time_encoding as encoding
 from ._time_control import time_control
 
+executors = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+def _open_time_control(identity, **kwargs):
+    """Open identity as ``time_control`` object and read its time axis."""
+    tco = time_control(identity, **kwargs)
+    tco.time
+    return tco
+
 
 class time_compare(time_control):
     """Class for getting the intersection of two time axis.
@@ -10,37 +27,126 @@ class time_compare(time_control):
     ----------
     compare_objects: str or list or nested list
         List of all objects to compare their time axes
+    mode: {'full', 'time'}, default: 'time'
+        Open mode of files on disk. See ``netcdf_basics``.
+    workers: int, optional
+        Number of `compare_objects` opened concurrently.
+        By default, `compare_objects` are opened one after another.
+    executor: {'thread', 'process'}, default: 'thread'
+        Pool of workers opening `compare_objects` concurrently.
+        Opening files is mostly I/O-latency bound, so threads are
+        usually sufficient.
+    kwargs:
+        Optional parameters transferred to each ``time_control``
+        object, e.g. `scheduler`. See ``netcdf_basics``.
     """
 
-    def __init__(self, *compare_objects, **kwargs):
+    def __init__(
+        self,
+        *compare_objects,
+        mode="time",
+        workers=None,
+        executor="thread",
+        **kwargs,
+    ):
+        kwargs["mode"] = mode
         self.compare_objects = self.compare_objects(compare_objects)
-        self.time_control_objects = self.time_control_objects(**kwargs)
+        self.failures = []
+        self.time_control_objects = self.time_control_objects(
+            workers=workers,
+            executor=executor,
+            **kwargs,
+        )
         self.times = self.times()
 
     def compare_objects(self, compare_objects):
         """List of all objects to compare their time axes."""
         return self._flatten_list(compare_objects)
 
-    def time_control_objects(self, **kwargs):
-        """List of all `compare_objects` set to time_control objects."""
-        return [
-            self._to_time_control_object(
-                cpo,
-                **kwargs,
+    def time_control_objects(self, workers=None, executor="thread", **kwargs):
+        """List of all `compare_objects` set to time_control objects.
+
+        The order of `compare_objects` is kept. `compare_objects` which
+        could not be opened are reported and written to `failures`.
+
+        Raises
+        ------
+        ValueError
+            If none of the `compare_objects` could be opened.
+        """
+        if not workers or workers < 2:
+            results = [
+                self._to_time_control_object(cpo, **kwargs)
+                for cpo in self.compare_objects
+            ]
+        else:
+            with executors[executor](max_workers=workers) as pool:
+                futures = [
+                    self._to_time_control_object(cpo, pool=pool, **kwargs)
+                    for cpo in self.compare_objects
+                ]
+                results = [self._result(future) for future in futures]
+        tcos = []
+        for cpo, tco in zip(self.compare_objects, results):
+            if isinstance(tco, Exception):
+                print("Could not open {}: {}".format(cpo, tco))
+                self.failures += [(cpo, tco)]
+                continue
+            tcos += [tco]
+        if self.compare_objects and not tcos:
+            raise ValueError(
+                "Could not open any of {}.".format(self.compare_objects)
+            ) from self.failures[0][1]
+        return tcos
+
+    def _report_failures(self):
+        """Report `failures` missing in the intersection of time axes."""
+        if not self.failures:
+            return
+        print(
+            "Intersection excludes {} which could not be opened.".format(
+                self._failed_objects()
             )
-            for cpo in self.compare_objects
-        ]
+        )
+
+    def _failed_objects(self):
+        """Names of all `compare_objects` which could not be opened."""
+        return [str(cpo) for cpo, exc in self.failures]
+
+    def _flag_failures(self, tco):
+        """Write `failures` to global attributes of `tco`."""
+        if not self.failures:
+            return
+        tco._require_data()
+        tco.ds.attrs["failed_compare_objects"] = str(self._failed_objects())
 
     def times(self):
         """List of all time axes read from ``time_control_objects``."""
         return [tco.time for tco in self.time_control_objects]
 
-    def _to_time_control_object(self, identity, **kwargs):
-        """Open identity as ``time_control`` object."""
+    def _to_time_control_object(self, identity, pool=None, **kwargs):
+        """Open identity as ``time_control`` object.
+
+        If `pool` submit opening to `pool` and return the future.
+        Exceptions are returned instead of raised.
+        """
         if isinstance(identity, time_control):
             return identity
-        else:
-            return time_control(identity, **kwargs)
+        if pool is not None:
+            return pool.submit(_open_time_control, identity, **kwargs)
+        try:
+            return _open_time_control(identity, **kwargs)
+        except Exception as exc:
+            return exc
+
+    def _result(self, future):
+        """Result of future or exception if raised."""
+        if isinstance(future, time_control):
+            return future
+        try:
+            return future.result()
+        except Exception as exc:
+            return exc
 
     def max_intersection(self):
         """Get the maximum intersection of all time axes.
@@ -51,7 +157,9 @@ class time_compare(time_control):
         Returns
         -------
         tuple
-            Left and right border of maximum time intersection
+            Left and right border of maximum time intersection.
+            `compare_objects` in `failures` are not considered
+            and reported.
 
         Example
         -------
@@ -65,6 +173,7 @@ class time_compare(time_control):
 
 
         """
+        self._report_failures()
         start, end = None, None
         for time in self.times:
             if not start:
@@ -97,6 +206,8 @@ class time_compare(time_control):
             List of user-given netCDF files on disk
             and/or ``time_control`` objects
             cropped to maximum time intersection.
+            `compare_objects` in `failures` are written to the global
+            attribute `failed_compare_objects` of each object.
 
         Example
         -------
@@ -112,7 +223,161 @@ class time_compare(time_control):
         max_intersection = self.max_intersection()
         if max_intersection == (None, None):
             return
+        for tco in self.time_control_objects:
+            self._flag_failures(tco)
         return [
             tco.select_time_range(max_intersection, **kwargs)
             for tco in self.time_control_objects
         ]
+
+    def _common_resolution(self):
+        """Coarsest resolution and calendar of all time axes.
+
+        Returns
+        -------
+        tuple
+            List of ``datetime.datetime`` instance attributes to be
+            ignored and calendar. Calendar is None if the calendars
+            of the time axes differ.
+        """
+        tcos = self.time_control_objects
+        resolutions = [encoding.get_resolution(tco.equalize) for tco in tcos]
+        resolution = min(resolutions, key=encoding.units.index)
+        index = encoding.units.index(resolution)
+        ignore = encoding.units[index:][1:]
+        calendars = [tco.calendar for tco in self.time_control_objects]
+        date_types = {encoding.date_types.get(cal) for cal in calendars}
+        if len(date_types) > 1:
+            return ignore, None
+        return ignore, calendars[0]
+
+    def _encoded_times(self, ignore, calendar):
+        """Time axes of ``time_control_objects`` encoded as int64
+        ordinals with a common resolution.
+        """
+        resolution = encoding.get_resolution(ignore)
+        times = []
+        for tco in self.time_control_objects:
+            if encoding.get_resolution(tco.equalize) == resolution:
+                time = tco._encoded_time
+            else:
+                time = self._encode_time(tco.time, ignore, calendar)
+            times += [time]
+        return times
+
+    def _sorted(self, time):
+        """Sorted time axis and stable sort order.
+        Sort order is None if `time` is already sorted.
+        """
+        if np.all(time[1:] >= time[:-1]):
+            return time, None
+        order = np.argsort(time, kind="stable")
+        return time[order], order
+
+    def _intersect(self):
+        """Encoded time steps shared by all time axes.
+
+        Members are intersected one after another starting with the
+        shortest time axis. Candidates are looked up by binary search
+        in each member's sorted time axis.
+
+        Returns
+        -------
+        common: np.ndarray
+            Sorted int64 ordinals of common time steps.
+        indices: list
+            Index of the first occurrence of each common time step
+            for each member of ``time_control_objects``.
+        """
+        ignore, calendar = self._common_resolution()
+        if calendar is None:
+            print("Time axes with different calendars can not be compared.")
+            return np.array([], dtype="int64"), []
+        times = self._encoded_times(ignore, calendar)
+        order = sorted(range(len(times)), key=lambda i: len(times[i]))
+        common = np.unique(times[order[0]])
+        for i in order[1:]:
+            if not len(common):
+                break
+            values, _ = self._sorted(times[i])
+            pos = np.searchsorted(values, common)
+            found = pos < len(values)
+            found[found] = values[pos[found]] == common[found]
+            common = common[found]
+        indices = []
+        for time in times:
+            values, sort_order = self._sorted(time)
+            pos = np.searchsorted(values, common)
+            if sort_order is not None:
+                pos = sort_order[pos]
+            indices += [pos]
+        return common, indices
+
+    def common_timesteps(self):
+        """Get the time steps shared by all time axes.
+
+        Time steps are compared with the coarsest resolution of all
+        time axes. See ``time_control.equalize``.
+
+        Returns
+        -------
+        CFTimeIndex or DatetimeIndex
+            Common time steps as found in the first time axis.
+            `compare_objects` in `failures` are not considered
+            and reported.
+
+        Example
+        -------
+        To get the time steps of two netCDF files
+        shared by both files.::
+
+            from pyhomogenize import time_compare
+
+            common = time_compare('input1.nc',
+                                  'input2.nc').common_timesteps()
+
+        """
+        self._report_failures()
+        common, indices = self._intersect()
+        if not indices:
+            return
+        return self.times[0][indices[0]]
+
+    def select_common_timesteps(self):
+        """Select time steps shared by all time axes.
+
+        Each member's first occurrence of each common time step is
+        selected lazily. All members are aligned time step by time step
+        afterwards.
+
+        Returns
+        -------
+        list
+            List of user-given netCDF files on disk
+            and/or ``time_control`` objects
+            cropped to common time steps.
+            `compare_objects` in `failures` are written to the global
+            attribute `failed_compare_objects` of each object.
+
+        Example
+        -------
+        To crop time axes of two netCDF files to common time steps.::
+
+            from pyhomogenize import time_compare
+
+            tcos = time_compare('input1.nc',
+                                'input2.nc').select_common_timesteps()
+
+        """
+        self._report_failures()
+        for tco in self.time_control_objects:
+            tco._require_data()
+        self.times = [tco.time for tco in self.time_control_objects]
+        common, indices = self._intersect()
+        if not indices:
+            return
+        for tco, index in zip(self.time_control_objects, indices):
+            tco.ds = tco._isel_time(index)
+            self._flag_failures(tco)
+        self.times = [tco.time for tco in self.time_control_objects]
+        return self.time_control_objects
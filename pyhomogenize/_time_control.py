@@ -1,8 +1,52 @@
+import json
+import os
+
+import numpy as np
 import xarray as xr
-from iteration_utilities import duplicates
 
 from . import _consts as consts
+from . import _time_encoding as encoding
+from . import _time_parsing as parsing
+from ._instrumentation import span
 from ._netcdf_basics import netcdf_basics
+from ._utilities import lazy_attribute
+
+
+def _take_aligned(array, index, axis=0):
+    """Select sorted `index` along `axis` of a dask array.
+
+    Each output chunk depends on a single input chunk only,
+    so that selected chunks are streamed one after another.
+    """
+    import dask.array as da
+
+    bounds = np.cumsum((0,) + array.chunks[axis])
+    starts = np.searchsorted(index, bounds)
+    parts = []
+    for i, (start, end) in enumerate(zip(starts[:-1], starts[1:])):
+        if start == end:
+            continue
+        block = array.blocks[(slice(None),) * axis + (i,)]
+        local = index[start:end] - bounds[i]
+        parts += [block[(slice(None),) * axis + (local,)]]
+    if not parts:
+        return array[(slice(None),) * axis + (index,)]
+    return da.concatenate(parts, axis=axis)
+
+
+def _read_state(state):
+    """Read check state from JSON file. See `check_increment`."""
+    if not isinstance(state, str):
+        return state
+    if not os.path.isfile(state):
+        return
+    with open(state) as f:
+        return json.load(f)
+
+
+def _join(*timesteps):
+    """Join comma-separated strings of time steps."""
+    return ",".join(filter(None, timesteps))
 
 
 class time_control(netcdf_basics):
@@ -13,39 +57,46 @@ class time_control(netcdf_basics):
 
     def __init__(self, *args, **kwargs):
         netcdf_basics.__init__(self, *args, **kwargs)
-        self.time = self.time()
         del self.frequency
-        self.frequency = self.frequency()
-        self.time_fmt = self.time_fmt()
-        self.equalize = self.equalize()
         del self.calendar
-        self.calendar = self.calendar()
 
+    @lazy_attribute
     def time(self):
         """netCDF file's time axis"""
-        return self._convert_time(self.ds.time)
+        time = self.ds.time
+        with span("convert_time", length=time.size):
+            return self._convert_time(time)
 
+    @lazy_attribute
     def frequency(self):
         """netCDF file's frequency"""
         return self._get_frequency()
 
+    @lazy_attribute
     def time_fmt(self):
         """predefined explicit format string derived from `frequency`"""
         return consts.format[self.ds.frequency]
 
+    @lazy_attribute
     def equalize(self):
         """predefined list of ``datetime.datetime`` instance attributes
         to be ignored
         """
         return consts.equalize[self.ds.frequency]
 
+    @lazy_attribute
     def calendar(self):
         """Calendar type read from netCDF file"""
-        return self.time.calendar
+        calendar = getattr(self.time, "calendar", None)
+        if calendar is None:
+            time = self.ds.time
+            calendar = time.encoding.get("calendar")
+            calendar = time.attrs.get("calendar", calendar or "standard")
+        return calendar
 
     def _get_frequency(self):
         """Get frequency of xr.Dataset"""
-        frequency = xr.infer_freq(self.ds.time)
+        frequency = xr.infer_freq(self.time)
         if not frequency:
             try:
                 frequency = consts.frequencies[self.ds.frequency]
@@ -54,56 +105,212 @@ class time_control(netcdf_basics):
                 return
         return frequency
 
+    @lazy_attribute
+    def _encoded_time(self):
+        """Time axis encoded as int64 ordinals. See `_encode_time`"""
+        time = self.time
+        with span("equalize", length=len(time)):
+            return self._encode_time(
+                time,
+                ignore=self.equalize,
+                calendar=self.calendar,
+            )
+
+    def _encoded_date_range(self, time):
+        """Expected time axis between first and last element of `time`
+        encoded as int64 ordinals.
+        """
+        start, end = self._decode_time(time[[0, -1]], ignore=self.equalize)
+        date_range = self.date_range(
+            start,
+            end,
+            self.frequency,
+            calendar=self.calendar,
+        )
+        return self._encode_time(
+            date_range,
+            ignore=self.equalize,
+            calendar=self.calendar,
+        )
+
+    def _compare_to_date_range(self, time, values):
+        """Compare encoded time axis with expected time axis
+        between first and last element of `time`.
+
+        For frequencies with an integer step in the axis's resolution
+        the expected time axis is never built.
+
+        Parameters
+        ----------
+        time: np.ndarray
+            int64 ordinals; see `_encoded_time`
+        values: np.ndarray
+            sorted unique elements of `time`
+
+        Returns
+        -------
+        found: np.ndarray
+            boolean mask of `values` on the expected time axis
+        missings: np.ndarray
+            int64 ordinals of the expected time axis not in `values`
+        """
+        step = self._get_step(
+            self.frequency,
+            encoding.get_resolution(self.equalize),
+        )
+        if step:
+            found, starts, counts = self._arithmetic_range(
+                values, time[0], time[-1], step
+            )
+            return found, self._expand_runs(starts, counts, step)
+        expected = np.unique(self._encoded_date_range(time))
+        pos = np.searchsorted(expected, values)
+        found = pos < len(expected)
+        found[found] = expected[pos[found]] == values[found]
+        pos = np.searchsorted(values, expected)
+        avail = pos < len(values)
+        avail[avail] = values[pos[avail]] == expected[avail]
+        return found, expected[~avail]
+
+    def _diagnose(self, selection=["duplicates", "redundants", "missings"]):
+        """Locate duplicated, redundant and missing time steps
+        in one sort/merge pass over the encoded time axis.
+
+        Parameters
+        ----------
+        selection: str or list, default=['duplicates','redundants','missings']
+            Kind of time steps to locate.
+
+        Returns
+        -------
+        dict
+            Encoded time steps for each entry of `selection` and
+            indices of time steps to keep (`timesteps`).
+            Repeated occurrences of located time steps are deleted.
+        """
+        if isinstance(selection, str):
+            selection = [selection]
+        selection = [select.lstrip("_") for select in selection]
+        time = self._encoded_time
+        with span("diagnose", selection=selection):
+            return self._diagnose_encoded(time, selection)
+
+    def _diagnose_encoded(self, time, selection):
+        """Locate time steps in encoded time axis. See `_diagnose`"""
+        values, first, inverse, counts = np.unique(
+            time,
+            return_index=True,
+            return_inverse=True,
+            return_counts=True,
+        )
+        flagged = np.zeros(len(values), dtype=bool)
+        result = {}
+        if "duplicates" in selection:
+            result["duplicates"] = np.repeat(values, counts - 1)
+            flagged |= counts > 1
+        if "redundants" in selection or "missings" in selection:
+            found, missings = self._compare_to_date_range(time, values)
+            if "redundants" in selection:
+                result["redundants"] = values[~found]
+                flagged |= ~found
+            if "missings" in selection:
+                result["missings"] = missings
+        keep = np.ones(len(time), dtype=bool)
+        keep[flagged[inverse.ravel()]] = False
+        keep[first] = True
+        result["timesteps"] = np.flatnonzero(keep)
+        return result
+
     def _duplicates(self):
         """Get duplicated time steps."""
-        time = self._equalize_time(self.time, ignore=self.equalize)
-        return sorted(list(duplicates(time)))
+        return self._diagnose("duplicates")["duplicates"]
 
     def _missings(self):
         """Get missing time steps."""
-        time = self._equalize_time(self.time, ignore=self.equalize)
-        date_range = self._equalize_time(
-            self.date_range(
-                time[0], time[-1], self.frequency, calendar=self.time.calendar
-            ),
-            ignore=self.equalize,
-        )
-        return sorted(list(set(date_range).difference(time)))
+        return self._diagnose("missings")["missings"]
 
     def _redundants(self):
         """Get redundant time steps."""
-        time = self._equalize_time(self.time, ignore=self.equalize)
-        date_range = self._equalize_time(
-            self.date_range(
-                time[0], time[-1], self.frequency, calendar=self.time.calendar
-            ),
-            ignore=self.equalize,
-        )
-        return sorted(list(set(time).difference(date_range)))
+        return self._diagnose("redundants")["redundants"]
+
+    def _format_timesteps(self, timesteps, intervals=False):
+        """Convert encoded time steps to a comma-separated string.
 
-    def _write_timesteps(self, timesteps, naming):
+        Parameters
+        ----------
+        timesteps: np.ndarray
+            Sorted int64 ordinals; see `_encoded_time`
+        intervals: bool, default: False
+            Write runs of consecutive time steps in interval notation
+            `start/end/count`. Time steps are only combined if the
+            frequency is a multiple of the time axis' resolution.
+
+        Returns
+        -------
+        str
+        """
+        timesteps = np.asarray(timesteps, dtype="int64")
+        resolution = encoding.get_resolution(self.equalize)
+        fields = encoding.decode_fields(
+            timesteps,
+            resolution=resolution,
+            calendar=self.calendar,
+        )
+        for field in parsing.fields:
+            fields.setdefault(field, np.ones(len(timesteps), dtype="int64"))
+        step = None
+        if intervals and len(timesteps):
+            step = self._get_step(self.frequency, resolution)
+        if step:
+            firsts, lasts, counts = self._find_runs(timesteps, step)
+            index = np.stack([firsts, lasts], axis=-1).ravel()
+            fields = {key: value[index] for key, value in fields.items()}
+        try:
+            strings = parsing.format_fields(fields, self.fmt)
+        except ValueError:
+            dates = self._decode_time(timesteps, ignore=self.equalize)
+            if step:
+                dates = [dates[i] for i in index]
+            strings = [self.date_to_str(date) for date in dates]
+        if not step:
+            return ",".join(strings)
+        runs = zip(strings[::2], strings[1::2], counts.tolist())
+        runs = [
+            "{}/{}/{}".format(first, last, count) if count > 1 else first
+            for first, last, count in runs
+        ]
+        return ",".join(runs)
+
+    def _write_timesteps(self, timesteps, naming, intervals=False):
         """Write timesteps to variable attributes."""
-        timesteps = self._convert_to_string(timesteps)
+        timesteps = self._format_timesteps(timesteps, intervals=intervals)
         self._dictionary(naming, self.name, timesteps)
         self.to_variable_attributes(timesteps, naming)
 
-    def get_duplicates(self):
-        """Get string of duplicated time steps."""
-        return self._convert_to_string(self._duplicates())
+    def get_duplicates(self, intervals=False):
+        """Get string of duplicated time steps.
+        See `check_timestamps` for `intervals`.
+        """
+        return self._format_timesteps(self._duplicates(), intervals=intervals)
 
-    def get_missings(self):
-        """Get string of missing time steps."""
-        return self._convert_to_string(self._missings())
+    def get_missings(self, intervals=False):
+        """Get string of missing time steps.
+        See `check_timestamps` for `intervals`.
+        """
+        return self._format_timesteps(self._missings(), intervals=intervals)
 
-    def get_redundants(self):
-        """Get string of redundant time steps."""
-        return self._convert_to_string(self._redundants())
+    def get_redundants(self, intervals=False):
+        """Get string of redundant time steps.
+        See `check_timestamps` for `intervals`.
+        """
+        return self._format_timesteps(self._redundants(), intervals=intervals)
 
     def check_timestamps(
         self,
         selection=["duplicates", "redundants", "missings"],
         output=None,
         correct=False,
+        intervals=False,
     ):
         """Check netCDF file's time axis.
 
@@ -118,6 +325,10 @@ class time_control(netcdf_basics):
         correct: bool, default: False
             Delete located time steps from xr.Dataset.
             Automatically set True if output.
+        intervals: bool, default: False
+            Write runs of consecutive time steps in interval notation
+            `start/end/count`, e.g. '2005-01-01/2005-12-31/365',
+            instead of listing each time step.
 
         Returns
         -------
@@ -133,34 +344,240 @@ class time_control(netcdf_basics):
             time_control('input.nc').check_timestamps(output='output.nc')
 
         """
+        self._require_data()
         if isinstance(selection, str):
             selection = [selection]
-        deletes = []
-        time = self._equalize_time(self.time, ignore=self.equalize)
+        result = self._diagnose(selection)
+        self._apply_diagnosis(
+            result,
+            selection,
+            output=output,
+            correct=correct,
+            intervals=intervals,
+            method="check_timestamps",
+        )
+        return self
+
+    def _apply_diagnosis(
+        self,
+        result,
+        selection,
+        output=None,
+        correct=False,
+        intervals=False,
+        method=None,
+    ):
+        """Write located time steps to variable attributes and delete
+        them from xr.Dataset. See `check_timestamps`.
+        """
         for select in selection:
-            nmng = consts.naming[select]
-            if not select.startswith("_"):
-                select = "_" + select
-            add = getattr(self, select)()
-
-            for a in add:
-                loc = [i for i, e in enumerate(time) if e == a][1:]
-                deletes += loc
-            self._write_timesteps(add, nmng)
-        dlist = list(dict.fromkeys(deletes))
-        timesteps = [n for n, t in enumerate(time) if n not in dlist]
+            select = select.lstrip("_")
+            self._write_timesteps(
+                result[select],
+                consts.naming[select],
+                intervals=intervals,
+            )
+        timesteps = result["timesteps"]
         if output:
             correct = True
         if correct:
-            self.ds = self.ds.isel(time=timesteps)
-            self.time = self._convert_time(self.ds.time)
+            with span("select", method=method) as stage:
+                self.ds = stage.tasks(self._isel_time(timesteps))
         if output:
             self.write(output=output)
+
+    def check_increment(
+        self,
+        state=None,
+        selection=["duplicates", "redundants", "missings"],
+        output=None,
+        correct=False,
+        intervals=False,
+    ):
+        """Check netCDF file's time axis as continuation of a previously
+        checked time axis.
+
+        Only the new time axis and the boundary to the last previously
+        checked time step are validated. Time steps not later than the
+        last previously checked time step are duplicates. They are
+        located and deleted only if `selection` contains duplicates.
+        The updated check state is written to the object's attribute
+        `state`.
+
+        Parameters
+        ----------
+        state: dict or str, optional
+            Check state of the previously checked time axis or
+            JSON file containing it. The updated check state is written
+            back to the JSON file. If None or the JSON file does not
+            exist, the whole time axis is checked as first segment.
+        selection: str or list, default=['duplicates','redundants','missings']
+            Check which kind of time steps exist.
+        output: str, optional
+            Write result on disk.
+        correct: bool, default: False
+            Delete located time steps from xr.Dataset.
+            Automatically set True if output.
+        intervals: bool, default: False
+            See `check_timestamps`.
+
+        Returns
+        -------
+        self
+
+        Raises
+        ------
+        ValueError
+            If frequency or calendar differ from the check state.
+
+        Example
+        -------
+        To check a daily file appended to a previously checked time series::
+
+            from pyhomogenize import time_control
+
+            time_control('new.nc').check_increment(state='state.json')
+
+        """
+        self._require_data()
+        previous = _read_state(state)
+        if isinstance(selection, str):
+            selection = [selection]
+        selection = [select.lstrip("_") for select in selection]
+        if previous:
+            checked = {
+                "frequency": self.ds.frequency,
+                "calendar": self.calendar,
+            }
+            for attr, value in checked.items():
+                if previous[attr] != value:
+                    raise ValueError(
+                        "The {} {} differs from the checked {} {}.".format(
+                            attr, value, attr, previous[attr]
+                        )
+                    )
+        time = self._encoded_time
+        with span("diagnose", selection=selection, increment=True):
+            result = self._diagnose_increment(time, previous, selection)
+        self._apply_diagnosis(
+            result,
+            selection,
+            output=output,
+            correct=correct,
+            intervals=intervals,
+            method="check_increment",
+        )
+        self.state = self._update_state(
+            previous,
+            time[result["timesteps"]],
+            result,
+            selection,
+            intervals=intervals,
+        )
+        if isinstance(state, str):
+            with open(state, "w") as f:
+                json.dump(self.state, f, indent=2)
         return self
 
+    def _diagnose_increment(self, time, state, selection):
+        """Locate time steps in encoded time axis continuing
+        the time axis of check state `state`. See `check_increment`.
+        """
+        if not state or not state.get("end"):
+            return self._diagnose_encoded(time, selection)
+        end = self.str_to_date(state["end"], calendar=self.calendar)
+        end = self._encode_time(
+            xr.CFTimeIndex([end]),
+            ignore=self.equalize,
+            calendar=self.calendar,
+        )
+        overlap = time <= end[0]
+        later = np.flatnonzero(~overlap)
+        result = self._diagnose_encoded(
+            np.concatenate([end, time[later]]),
+            selection,
+        )
+        timesteps = later[result["timesteps"][1:] - 1]
+        if "duplicates" in selection:
+            duplicates = np.concatenate([result["duplicates"], time[overlap]])
+            result["duplicates"] = np.sort(duplicates)
+        else:
+            timesteps = np.union1d(np.flatnonzero(overlap), timesteps)
+        result["timesteps"] = timesteps
+        return result
+
+    def _update_state(self, state, kept, result, selection, intervals=False):
+        """Check state after checking time axis. See `check_increment`."""
+        if not state:
+            state = {
+                "frequency": self.ds.frequency,
+                "calendar": self.calendar,
+                "start": None,
+                "end": None,
+                "length": 0,
+                "files": [],
+            }
+        state = dict(state)
+        if len(kept):
+            bounds = np.array([kept.min(), kept.max()])
+            start, end = self._format_timesteps(bounds).split(",")
+            state["start"] = state["start"] or start
+            if not state["end"] or self._later(end, state["end"]):
+                state["end"] = end
+        state["length"] += len(kept)
+        files = self.files
+        if not isinstance(files, list):
+            files = [files]
+        state["files"] = state["files"] + [
+            file for file in files if isinstance(file, str)
+        ]
+        for select in selection:
+            timesteps = self._format_timesteps(
+                result[select],
+                intervals=intervals,
+            )
+            state[select] = _join(state.get(select, ""), timesteps)
+        return state
+
+    def _later(self, date, other):
+        """Whether `date` is later than `other`, both as strings."""
+        date = self.str_to_date(date, calendar=self.calendar)
+        other = self.str_to_date(other, calendar=self.calendar)
+        return date > other
+
+    def _isel_time(self, timesteps):
+        """Select time steps by index from `ds`.
+
+        dask chunk boundaries are kept for sorted `timesteps`.
+        See `_take_aligned`.
+
+        Parameters
+        ----------
+        timesteps: np.ndarray
+            Indices of time steps to select.
+
+        Returns
+        -------
+        xr.Dataset
+        """
+        timesteps = np.asarray(timesteps)
+        ds = self.ds.isel(time=timesteps)
+        if np.any(np.diff(timesteps) < 0):
+            return ds
+        for var, da in self.ds.data_vars.items():
+            if da.chunks is None or "time" not in da.dims:
+                continue
+            axis = da.get_axis_num("time")
+            data = _take_aligned(da.data, timesteps, axis=axis)
+            ds[var] = ds[var].copy(data=data)
+        return ds
+
     def select_time_range(self, time_range, output=None):
         """Select user-given time slice from xr.Dataset
 
+        Files on disk not overlapping the time slice are not opened.
+        See ``prune_files``.
+
         Parameters
         ----------
         time_range: list
@@ -188,8 +605,11 @@ class time_control(netcdf_basics):
             start_date = self.date_to_str(start_date)
         if not isinstance(end_date, str):
             end_date = self.date_to_str(end_date)
-        self.ds = self.ds.sel(time=slice(start_date, end_date))
-        self.time = self._convert_time(self.ds.time)
+        self.prune_files([start_date, end_date])
+        self._require_data()
+        ds = self.ds
+        with span("select", method="select_time_range") as stage:
+            self.ds = stage.tasks(ds.sel(time=slice(start_date, end_date)))
         if output:
             self.write(output=output)
         return self
@@ -229,13 +649,15 @@ class time_control(netcdf_basics):
                                                output='output.nc')
 
         """
+        self._require_data()
         start, end = self.date_range_to_frequency_limits(
             self, date_range=self.time, frequency=self.frequency, **kwargs
         )
         start_date = self.date_to_str(start)
         end_date = self.date_to_str(end)
-        self.ds = self.ds.sel(time=slice(start_date, end_date))
-        self.time = self._convert_time(self.ds.time)
+        ds = self.ds
+        with span("select", method="select_limited_time_range") as stage:
+            self.ds = stage.tasks(ds.sel(time=slice(start_date, end_date)))
         if output:
             self.write(output=output)
         return self
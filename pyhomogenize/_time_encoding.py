@@ -0,0 +1,343 @@
+"""Calendar-aware integer encoding of time axes.
+
+Time axes are represented as int64 ordinals counting the number of
+`resolution` units since a calendar specific epoch. Two timestamps
+sharing the same ordinal are equal with respect to the resolution.
+"""
+
+import cftime
+import numpy as np
+
+from . import _time_parsing as parsing
+
+units = [
+    "year",
+    "month",
+    "day",
+    "hour",
+    "minute",
+    "second",
+    "microsecond",
+    "nanosecond",
+]
+
+per_day = {
+    "day": 1,
+    "hour": 24,
+    "minute": 24 * 60,
+    "second": 24 * 60 * 60,
+}
+
+gregorian_start = 2299161
+
+epoch = 2440588
+
+date_types = {
+    "standard": cftime.DatetimeGregorian,
+    "gregorian": cftime.DatetimeGregorian,
+    "proleptic_gregorian": cftime.DatetimeProlepticGregorian,
+    "julian": cftime.DatetimeJulian,
+    "noleap": cftime.DatetimeNoLeap,
+    "365_day": cftime.DatetimeNoLeap,
+    "all_leap": cftime.DatetimeAllLeap,
+    "366_day": cftime.DatetimeAllLeap,
+    "360_day": cftime.Datetime360Day,
+}
+
+_cumdays_noleap = np.array(
+    [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334, 365],
+    dtype="int64",
+)
+_cumdays_leap = np.array(
+    [0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335, 366],
+    dtype="int64",
+)
+
+
+def get_resolution(ignore):
+    """Get finest ``datetime.datetime`` instance attribute not ignored.
+
+    Parameters
+    ----------
+    ignore: list
+        list of ``datetime.datetime`` instance attributes to be ignored
+
+    Returns
+    -------
+    str
+    """
+    ignored = [units.index(ignr) for ignr in ignore if ignr in units]
+    if not ignored:
+        return "second"
+    return units[max(min(ignored) - 1, 0)]
+
+
+def get_calendar(time):
+    """Get calendar of ``CFTimeIndex`` or ``DatetimeIndex``."""
+    calendar = getattr(time, "calendar", None)
+    if calendar is None:
+        return "proleptic_gregorian"
+    return calendar
+
+
+def _jdn(year, month, day, julian=False):
+    """Julian day number of Gregorian or Julian calendar dates."""
+    a = (14 - month) // 12
+    yy = year + 4800 - a
+    mm = month + 12 * a - 3
+    jdn = day + (153 * mm + 2) // 5 + 365 * yy + yy // 4
+    if julian:
+        return jdn - 32083
+    return jdn - yy // 100 + yy // 400 - 32045
+
+
+def _from_jdn(jdn, julian=False):
+    """Gregorian or Julian calendar dates of julian day numbers."""
+    if julian:
+        b = 0
+        c = jdn + 32082
+    else:
+        a = jdn + 32044
+        b = (4 * a + 3) // 146097
+        c = a - 146097 * b // 4
+    d = (4 * c + 3) // 1461
+    e = c - 1461 * d // 4
+    m = (5 * e + 2) // 153
+    day = e - (153 * m + 2) // 5 + 1
+    month = m + 3 - 12 * (m // 10)
+    year = 100 * b + d - 4800 + m // 10
+    return year, month, day
+
+
+def _day_ordinals(year, month, day, calendar):
+    """Number of days since calendar specific epoch."""
+    if calendar in ["360_day"]:
+        return year * 360 + (month - 1) * 30 + day - 1
+    if calendar in ["noleap", "365_day"]:
+        return year * 365 + _cumdays_noleap[month - 1] + day - 1
+    if calendar in ["all_leap", "366_day"]:
+        return year * 366 + _cumdays_leap[month - 1] + day - 1
+    if calendar in ["julian"]:
+        return _jdn(year, month, day, julian=True)
+    if calendar in ["standard", "gregorian"]:
+        gregorian = _jdn(year, month, day)
+        return np.where(
+            gregorian >= gregorian_start,
+            gregorian,
+            _jdn(year, month, day, julian=True),
+        )
+    if calendar in ["proleptic_gregorian"]:
+        return _jdn(year, month, day)
+    raise ValueError("Calendar {} is not supported.".format(calendar))
+
+
+def _from_day_ordinals(ordinals, calendar):
+    """Dates of number of days since calendar specific epoch."""
+
+    def _fixed_length(ordinals, cumdays):
+        year, doy = np.divmod(ordinals, cumdays[-1])
+        month = np.searchsorted(cumdays, doy, side="right")
+        return year, month, doy - cumdays[month - 1] + 1
+
+    if calendar in ["360_day"]:
+        year, doy = np.divmod(ordinals, 360)
+        month, day = np.divmod(doy, 30)
+        return year, month + 1, day + 1
+    if calendar in ["noleap", "365_day"]:
+        return _fixed_length(ordinals, _cumdays_noleap)
+    if calendar in ["all_leap", "366_day"]:
+        return _fixed_length(ordinals, _cumdays_leap)
+    if calendar in ["julian"]:
+        return _from_jdn(ordinals, julian=True)
+    if calendar in ["standard", "gregorian"]:
+        greg = _from_jdn(ordinals)
+        jul = _from_jdn(ordinals, julian=True)
+        is_greg = ordinals >= gregorian_start
+        return tuple(np.where(is_greg, g, j) for g, j in zip(greg, jul))
+    if calendar in ["proleptic_gregorian"]:
+        return _from_jdn(ordinals)
+    raise ValueError("Calendar {} is not supported.".format(calendar))
+
+
+def _field(time, attr):
+    return np.asarray(getattr(time, attr), dtype="int64")
+
+
+def encode(time, resolution="minute", calendar=None):
+    """Encode time axis as calendar-aware int64 ordinals.
+
+    Parameters
+    ----------
+    time: CFTimeIndex or DatetimeIndex
+        Time axis to be encoded
+    resolution: {'year', 'month', 'day', 'hour', 'minute', 'second'}
+        Truncate timestamps to `resolution`
+    calendar: str, optional
+        Calendar type for the datetimes.
+        Default is the inherent calendar of `time`.
+
+    Returns
+    -------
+    np.ndarray
+        int64 ordinals
+    """
+    if calendar is None:
+        calendar = get_calendar(time)
+    if len(time) == 0:
+        return np.array([], dtype="int64")
+    attrs = units[: units.index(resolution) + 1]
+    fields = {attr: _field(time, attr) for attr in attrs}
+    return encode_fields(fields, resolution=resolution, calendar=calendar)
+
+
+def encode_fields(fields, resolution="minute", calendar="standard"):
+    """Encode ``datetime.datetime`` instance attributes as int64 ordinals.
+
+    Parameters
+    ----------
+    fields: dict
+        int64 arrays of ``datetime.datetime`` instance attributes
+        down to `resolution`
+    resolution: {'year', 'month', 'day', 'hour', 'minute', 'second'}
+        Truncate timestamps to `resolution`
+    calendar: str, default: 'standard'
+        Calendar type for the datetimes.
+
+    Returns
+    -------
+    np.ndarray
+        int64 ordinals
+    """
+    year = fields["year"]
+    if resolution == "year":
+        return year
+    month = fields["month"]
+    if resolution == "month":
+        return year * 12 + month - 1
+    ordinals = _day_ordinals(year, month, fields["day"], calendar)
+    for attr in ["hour", "minute", "second"]:
+        if units.index(attr) > units.index(resolution):
+            break
+        factor = per_day[attr] // per_day[units[units.index(attr) - 1]]
+        ordinals = ordinals * factor + fields[attr]
+    return ordinals
+
+
+def decode_absolute(values, units="day as %Y%m%d.%f", calendar="standard"):
+    """Decode absolute time values arithmetically to int64 ordinals.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        Numeric time values, e.g. 20070101.5
+    units: str, default: 'day as %Y%m%d.%f'
+        Absolute time units. The fractional part of `values`
+        is a fraction of the unit in front of 'as'.
+    calendar: str, default: 'standard'
+        Calendar type for the datetimes.
+
+    Returns
+    -------
+    np.ndarray
+        int64 ordinals of resolution `second`; see `encode`
+    """
+    unit, fmt = [part.strip() for part in units.split(" as ", 1)]
+    unit = unit.rstrip("s")
+    if fmt.endswith(".%f"):
+        fmt = fmt[:-3]
+    parts, literal = parsing._split(fmt)
+    if literal or any(prefix for prefix, _ in parts) or unit not in per_day:
+        raise ValueError("Units {} are not supported.".format(units))
+    values = np.asarray(values, dtype="float64")
+    integer = np.floor(values)
+    fraction = (values - integer) * per_day["second"] / per_day[unit]
+    integer = integer.astype("int64")
+    fields = {"month": 1, "day": 1, "hour": 0, "minute": 0, "second": 0}
+    for _, directive in reversed(parts):
+        integer, value = np.divmod(integer, 10 ** parsing.widths[directive])
+        fields[parsing.directives[directive][0]] = value
+    if "year" not in fields:
+        raise ValueError("Units {} do not contain any year.".format(units))
+    ordinals = encode_fields(fields, resolution="second", calendar=calendar)
+    return ordinals + np.rint(fraction).astype("int64")
+
+
+def to_datetime64(ordinals):
+    """Convert proleptic Gregorian int64 ordinals of resolution `second`
+    to ``datetime64[s]``.
+    """
+    seconds = ordinals - epoch * per_day["second"]
+    return seconds.astype("datetime64[s]")
+
+
+def decode_fields(ordinals, resolution="minute", calendar="standard"):
+    """Decode int64 ordinals to ``datetime.datetime`` instance attributes.
+
+    Parameters
+    ----------
+    ordinals: np.ndarray
+        int64 ordinals; see `encode`
+    resolution: {'year', 'month', 'day', 'hour', 'minute', 'second'}
+        Resolution of `ordinals`
+    calendar: str, default: 'standard'
+        Calendar type for the datetimes.
+
+    Returns
+    -------
+    dict
+        ``datetime.datetime`` instance attributes down to `resolution`.
+    """
+    ordinals = np.asarray(ordinals, dtype="int64")
+    if resolution == "year":
+        return {"year": ordinals}
+    if resolution == "month":
+        year, month = np.divmod(ordinals, 12)
+        return {"year": year, "month": month + 1}
+    days, seconds = np.divmod(ordinals, per_day[resolution])
+    seconds = seconds * (per_day["second"] // per_day[resolution])
+    year, month, day = _from_day_ordinals(days, calendar)
+    fields = {"year": year, "month": month, "day": day}
+    hour, seconds = np.divmod(seconds, 3600)
+    minute, second = np.divmod(seconds, 60)
+    for attr, value in zip(
+        ["hour", "minute", "second"],
+        [hour, minute, second],
+    ):
+        if units.index(attr) > units.index(resolution):
+            break
+        fields[attr] = value
+    return fields
+
+
+def decode(ordinals, resolution="minute", calendar="standard", fill=1):
+    """Decode int64 ordinals to ``cftime.datetime`` objects.
+
+    Parameters
+    ----------
+    ordinals: np.ndarray
+        int64 ordinals; see `encode`
+    resolution: {'year', 'month', 'day', 'hour', 'minute', 'second'}
+        Resolution of `ordinals`
+    calendar: str, default: 'standard'
+        Calendar type for the datetimes.
+    fill: int, default: 1
+        Value of ``cftime.datetime`` instance attributes finer
+        than `resolution`. Month and day are at least 1.
+
+    Returns
+    -------
+    list
+        list of ``cftime.datetime`` objects
+    """
+    fields = decode_fields(ordinals, resolution=resolution, calendar=calendar)
+    attrs = units[:-1]
+    columns = []
+    for attr in attrs:
+        if attr in fields:
+            columns += [fields[attr].tolist()]
+        elif attr in ["month", "day"]:
+            columns += [[max(fill, 1)] * len(ordinals)]
+        else:
+            columns += [[fill] * len(ordinals)]
+    date_type = date_types[calendar]
+    return [date_type(*date) for date in zip(*columns)]
@@ -0,0 +1,226 @@
+"""Compiled parsing of date strings into ``cftime.datetime`` objects
+and bulk formatting of dates into strings.
+
+Format strings are compiled once to regular expressions matching
+all prefixes of the format which end with a format directive,
+e.g. '%Y-%m-%dT%H:%M:%S' matches '2007', '2007-06', '2007-06-01T12'.
+Parsers are memoized per format string and calendar.
+"""
+
+import functools
+import re
+from datetime import timedelta as td
+
+import cftime
+import numpy as np
+
+fields = ["year", "month", "day", "hour", "minute", "second", "microsecond"]
+
+directives = {
+    "Y": ("year", r"\d{4}"),
+    "y": ("year", r"\d{2}"),
+    "m": ("month", r"\d{1,2}"),
+    "d": ("day", r"\d{1,2}"),
+    "H": ("hour", r"\d{1,2}"),
+    "M": ("minute", r"\d{1,2}"),
+    "S": ("second", r"\d{1,2}"),
+    "f": ("microsecond", r"\d{1,6}"),
+}
+
+widths = {"Y": 4, "y": 2, "m": 2, "d": 2, "H": 2, "M": 2, "S": 2, "f": 6}
+
+steps = {
+    "day": td(days=1),
+    "hour": td(hours=1),
+    "minute": td(minutes=1),
+}
+
+
+def _split(fmt):
+    """Split format string into literals and directives.
+
+    Returns
+    -------
+    tuple
+        List of pairs of leading literal and directive
+        and trailing literal.
+    """
+    parts = []
+    literal = ""
+    for token in re.findall(r"%.|%$|[^%]+", fmt):
+        if token == "%%":
+            literal += "%"
+        elif token.startswith("%"):
+            directive = token[1:]
+            if directive not in directives:
+                message = "Format directive {} in {} is not supported."
+                raise ValueError(message.format(token, fmt))
+            parts += [(literal, directive)]
+            literal = ""
+        else:
+            literal += token
+    return parts, literal
+
+
+@functools.lru_cache(maxsize=None)
+def compile_format(fmt):
+    """Compile format string to regular expression.
+
+    Parameters
+    ----------
+    fmt: str
+        Explicit format string containing the directives
+        %Y, %y, %m, %d, %H, %M, %S and %f.
+
+    Returns
+    -------
+    tuple
+        Compiled regular expression and list of directives.
+        The i-th directive is matched by group `gi`.
+    """
+    parts, literal = _split(fmt)
+    if not any(directives[d][0] == "year" for _, d in parts):
+        raise ValueError("Format {} does not contain any year.".format(fmt))
+    pattern = ""
+    if literal:
+        pattern = "(?:{})?".format(re.escape(literal))
+    for i, (literal, directive) in reversed(list(enumerate(parts))):
+        group = "(?P<g{}>{})".format(i, directives[directive][1])
+        pattern = re.escape(literal) + group + pattern
+        if i:
+            pattern = "(?:{})?".format(pattern)
+    return re.compile(pattern), [directive for _, directive in parts]
+
+
+def _end(date, field, calendar):
+    """Last second of the period of `field` containing `date`."""
+    if field in ["second", "microsecond"]:
+        return date
+    if field == "year":
+        date = cftime.datetime(date.year + 1, 1, 1, calendar=calendar)
+    elif field == "month":
+        year, month = divmod(date.month, 12)
+        year = date.year + year
+        date = cftime.datetime(year, month + 1, 1, calendar=calendar)
+    else:
+        date = date + steps[field]
+    return date - td(seconds=1)
+
+
+@functools.lru_cache(maxsize=None)
+def get_parser(fmt, calendar="standard"):
+    """Get memoized parser converting strings to ``cftime.datetime``.
+
+    Parameters
+    ----------
+    fmt: str
+        Explicit format string. See `compile_format`.
+    calendar: str, default: 'standard'
+        Calendar type for the datetimes.
+
+    Returns
+    -------
+    callable
+        Function converting a string to a ``cftime.datetime`` object.
+        Mode `start` sets instance attributes not parsed to their
+        first possible values, mode `end` to their last possible
+        values considering the finest parsed attribute.
+    """
+    regex, parts = compile_format(fmt)
+
+    def parse(string, mode="start"):
+        match = regex.fullmatch(string)
+        if match is None:
+            raise ValueError(
+                "Time {!r} does not match format {!r}.".format(string, fmt)
+            )
+        values = {"month": 1, "day": 1}
+        finest = 0
+        for i, directive in enumerate(parts):
+            value = match.group("g{}".format(i))
+            if value is None:
+                break
+            field = directives[directive][0]
+            if directive == "y":
+                value = int(value) + (2000 if int(value) < 69 else 1900)
+            elif directive == "f":
+                value = value.ljust(6, "0")
+            values[field] = int(value)
+            finest = max(finest, fields.index(field))
+        if "year" not in values:
+            message = "Time {!r} does not contain any year."
+            raise ValueError(message.format(string))
+        try:
+            date = cftime.datetime(
+                *[values.get(field, 0) for field in fields],
+                calendar=calendar,
+            )
+        except ValueError as exc:
+            raise ValueError(
+                "Time {!r} is not a valid date in calendar {!r}: {}".format(
+                    string, calendar, exc
+                )
+            )
+        if mode == "end":
+            return _end(date, fields[finest], calendar)
+        return date
+
+    return parse
+
+
+def parse(strings, fmt, calendar="standard", mode="start"):
+    """Convert string or array of strings to ``cftime.datetime``.
+
+    Parameters
+    ----------
+    strings: str or array-like
+        string(s) representing the time
+    fmt: str
+        Explicit format string. See `compile_format`.
+    calendar: str, default: 'standard'
+        Calendar type for the datetimes.
+    mode: {'start', 'end'}, default: 'start'
+        See `get_parser`.
+
+    Returns
+    -------
+    ``cftime.datetime`` object or list of ``cftime.datetime`` objects
+    """
+    parser = get_parser(fmt, calendar)
+    if isinstance(strings, str):
+        return parser(strings, mode=mode)
+    strings = np.asarray(strings, dtype=str)
+    values, inverse = np.unique(strings, return_inverse=True)
+    dates = [parser(value, mode=mode) for value in values]
+    return [dates[i] for i in inverse.ravel()]
+
+
+def format_fields(fields, fmt):
+    """Convert arrays of ``datetime.datetime`` instance attributes
+    to strings in bulk.
+
+    Parameters
+    ----------
+    fields: dict
+        Integer arrays of equal length for each instance attribute
+        used in `fmt`.
+    fmt: str
+        Explicit format string. See `compile_format`.
+
+    Returns
+    -------
+    list
+        List of strings.
+    """
+    parts, literal = _split(fmt)
+    template = ""
+    columns = []
+    for i, (prefix, directive) in enumerate(parts):
+        values = np.asarray(fields[directives[directive][0]])
+        if directive == "y":
+            values = values % 100
+        prefix = prefix.replace("{", "{{").replace("}", "}}")
+        template += "{}{{{}:0{}d}}".format(prefix, i, widths[directive])
+        columns += [values.tolist()]
+    template += literal.replace("{", "{{").replace("}", "}}")
+    return [template.format(*values) for values in zip(*columns)]
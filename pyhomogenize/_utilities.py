@@ -12,7 +12,7 @@ def check_existance(files):
         print("No input files selected.")
         return
     for file in files:
-        if not os.path.isfile(file):
+        if not os.path.exists(file):
             stop = True
             commands += "{} is not available\n".format(file)
     if stop:
@@ -30,3 +30,30 @@ def get_operator(object, name, type="attribute"):
     except Exception:
         print("Choosen {} {} is not available.".format(type, name))
         return
+
+
+class lazy_attribute:
+    """Attribute computed on first access and memoized
+    in the instance's ``__dict__``.
+
+    Delete the attribute to compute it again on next access.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.func(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+def reset_lazy_attributes(instance):
+    """Delete all memoized lazy attributes of `instance`."""
+    for name in dir(type(instance)):
+        if isinstance(getattr(type(instance), name, None), lazy_attribute):
+            instance.__dict__.pop(name, None)
@@ -2,6 +2,7 @@
 import argparse
 import sys
 
+from ._scheduler import schedulers
 from .pyhomogenize import pyhomogenize
 
 
@@ -9,14 +10,18 @@ def csv_list(string):
     return string.split(",")
 
 
+def operator_chain(string):
+    return [csv_list(operator) for operator in string.split(":")]
+
+
 def create_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "operator",
         nargs="?",
         default=None,
-        help="Operator",
-        type=csv_list,
+        help="Operator or chain of operators separated by ':'",
+        type=operator_chain,
     ),
     parser.add_argument(
         "-i",
@@ -38,6 +43,40 @@ def create_parser():
         action="store_true",
         help="Choose to get a list of all available operators.",
     )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        dest="workers",
+        type=int,
+        help="Number of dask workers opening, computing and writing data.",
+    )
+    parser.add_argument(
+        "--scheduler",
+        dest="scheduler",
+        choices=schedulers,
+        help="dask scheduler opening, computing and writing data.",
+    )
+    parser.add_argument(
+        "--memory_limit",
+        dest="memory_limit",
+        help="Memory budget, e.g. 4GB, driving dask chunks and workers.",
+    )
+    parser.add_argument(
+        "--intervals",
+        dest="intervals",
+        action="store_true",
+        help="Write runs of consecutive time steps as start/end/count.",
+    )
+    parser.add_argument(
+        "--state",
+        dest="state",
+        help="JSON file of a previous time axis check to be continued.",
+    )
+    parser.add_argument(
+        "--report",
+        dest="report",
+        help="Write JSON report of wall time and resources per stage.",
+    )
     return parser
 
 
@@ -1,6 +1,129 @@
 from pathlib import Path
 
+from . import _consts as consts
+
 data_path = Path(__file__).parent
 
 nclist = list((data_path / "data/netcdf").glob("*"))
 netcdf = sorted([nc.as_posix() for nc in nclist])
+
+units = {
+    "1hr": "hours",
+    "3hr": "hours",
+    "6hr": "hours",
+    "6hrPt": "hours",
+    "day": "days",
+    "mon": "days",
+    "yr": "days",
+}
+
+
+def synthetic_netcdf(
+    path,
+    frequency="day",
+    calendar="standard",
+    length=365,
+    grid=(10, 10),
+    start="2000-01-01",
+    duplicates=0,
+    missings=0,
+    redundants=0,
+    variable="tas",
+    seed=0,
+    encoding={},
+):
+    """Write synthetic CF-compliant netCDF file.
+
+    Duplicated, missing and redundant time steps are injected
+    at random positions except the first and last time step.
+
+    Parameters
+    ----------
+    path: str
+        Name of the netCDF output file.
+    frequency: {'1hr', '3hr', '6hr', 'day', 'mon', 'yr'}, default: 'day'
+        CF frequency of the time axis.
+    calendar: str, default: 'standard'
+        Calendar type for the datetimes.
+    length: int, default: 365
+        Number of time steps before injecting anomalies.
+    grid: tuple, default: (10, 10)
+        Number of latitudes and longitudes.
+    start: str, default: '2000-01-01'
+        First time step.
+    duplicates: int, default: 0
+        Number of duplicated time steps to inject.
+    missings: int, default: 0
+        Number of time steps to delete.
+    redundants: int, default: 0
+        Number of redundant time steps to inject.
+        Only available for sub-daily frequencies.
+    variable: str, default: 'tas'
+        Name of the CF variable.
+    seed: int, default: 0
+        Seed of the random number generator.
+    encoding: dict, optional
+        Encoding of the CF variable.
+
+    Returns
+    -------
+    str
+        Name of the netCDF output file.
+    """
+    from datetime import timedelta as td
+
+    import numpy as np
+    import xarray as xr
+
+    from ._basics import basics
+
+    if redundants and consts.translator[frequency] != "hour":
+        raise ValueError("Redundants are only available for sub-daily data.")
+    freq = basics()._interpret_frequency(frequency)
+    if isinstance(freq, list):
+        freq = freq[0]
+    time = xr.cftime_range(
+        start,
+        periods=length,
+        freq=freq,
+        calendar=calendar,
+    ).to_numpy()
+    if frequency == "mon":
+        time = time + td(days=14)
+    elif frequency == "yr":
+        time = time + td(days=182)
+    rng = np.random.default_rng(seed)
+    interior = np.arange(1, length - 1)
+    index = rng.choice(interior, missings + duplicates + redundants, False)
+    deletes = index[:missings]
+    doubles = index[missings:][:duplicates]
+    halves = index[missings:][duplicates:]
+    counts = np.ones(length, dtype=int)
+    counts[deletes] = 0
+    counts[doubles] = 2
+    positions = np.repeat(np.arange(length), counts)
+    # redundant time steps half way to the next time step
+    mids = time[halves] + (time[halves + 1] - time[halves]) / 2
+    order = np.argsort(
+        np.concatenate([positions, halves + 0.5]),
+        kind="stable",
+    )
+    time = xr.CFTimeIndex(np.concatenate([time[positions], mids])[order])
+    nlat, nlon = grid
+    data = rng.random((len(time), nlat, nlon), dtype="float32")
+    ds = xr.Dataset(
+        {variable: (("time", "lat", "lon"), data, {"units": "K"})},
+        coords={
+            "time": time,
+            "lat": ("lat", np.linspace(-90, 90, nlat), {"units": "degrees"}),
+            "lon": ("lon", np.linspace(0, 360, nlon, endpoint=False)),
+        },
+        attrs={"frequency": frequency, "Conventions": "CF-1.8"},
+    )
+    ds.time.encoding = {
+        "units": "{} since 1850-01-01".format(units[frequency]),
+        "calendar": calendar,
+        "dtype": "float64",
+    }
+    ds.to_netcdf(path, encoding={variable: encoding})
+    return path
@@ -1,21 +1,35 @@
-from . import merge  # noqa
-from . import seltimerange  # noqa
-from . import showdups  # noqa
-from . import showmiss  # noqa
-from . import showreds  # noqa
-from . import showtimestamps  # noqa
-from . import showvar  # noqa
-from . import timecheck  # noqa
+"""Operators are registered by name and imported on first access."""
 
-operators = """All available operators implemented:
+import importlib
+
+registry = [
+    "merge",
+    "showvar",
+    "seltimerange",
+    "showtimestamps",
+    "showdups",
+    "showmiss",
+    "showreds",
+    "timecheck",
+]
+
+header = """All available operators implemented:
 Arguments in brackets are optional.
+Operators can be chained with ':' sharing one opened dataset, e.g.
+    pyhomogenize timecheck:seltimerange,<timestamp1>,<timestamp2>
+                 -i ifile1 [ifile2 [ifileN]] -o ofile
 """
 
-operators += merge.help
-operators += showvar.help
-operators += seltimerange.help
-operators += showtimestamps.help
-operators += showdups.help
-operators += showmiss.help
-operators += showreds.help
-operators += timecheck.help
+
+def __getattr__(name):
+    if name in registry:
+        return importlib.import_module("." + name, __name__)
+    if name == "operators":
+        helps = [__getattr__(operator).help for operator in registry]
+        return header + "".join(helps)
+    msg = "module {} has no attribute {}".format(__name__, name)
+    raise AttributeError(msg)
+
+
+def __dir__():
+    return sorted(list(globals()) + registry + ["operators"])
@@ -5,6 +5,12 @@ merge : Merge given input files
     usage: pyhomogenize merge -i ifile1 [ifile2 [ifileN]] -o ofile
 """
 
+mode = "full"
+
+
+def apply(file, args):
+    return file.ds
+
 
 def start(args):
     file = pyh.netcdf_basics(args.input_files)
@@ -12,4 +18,4 @@ def start(args):
         print("No output file selecetd. Use -o <ofile>.")
     else:
         file.write(output=args.output_file)
-    return file.ds
+    return apply(file, args)
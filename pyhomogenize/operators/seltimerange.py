@@ -7,10 +7,22 @@ seltimerange : Select user-given time range. At first, merge files if needed.
     timeformat: %y%m%d[T:%H:%M:%S]
 """
 
+mode = "full"
+
+
+def apply(file, args):
+    file.select_time_range(args.arguments)
+    if file.pruning:
+        message = "Opened {opened} of {files} files within the time range."
+        print(message.format(**file.pruning))
+    return file.ds
+
 
 def start(args):
     file = pyh.time_control(args.input_files)
     if not args.output_file:
         print("No output file selecetd. Use -o <ofile>.")
-    file.select_time_range(args.arguments, output=args.output_file)
+    apply(file, args)
+    if args.output_file:
+        file.write(output=args.output_file)
     return file.ds
@@ -2,12 +2,20 @@ import pyhomogenize as pyh
 
 help = """
 showdups : Print duplicated timestamps. At first, merge files if needed.
-    usage: pyhomogenize showdups -i ifile1 [ifile2 [ifileN]]
+    usage: pyhomogenize showdups -i ifile1 [ifile2 [ifileN]] [--intervals]
 """
 
+mode = "time"
 
-def start(args):
-    file = pyh.time_control(args.input_files)
-    duplicates = file.get_duplicates()
+
+def apply(file, args):
+    duplicates = file.get_duplicates(
+        intervals=getattr(args, "intervals", False),
+    )
     print("Duplicated time steps: ", duplicates)
     return duplicates
+
+
+def start(args):
+    file = pyh.time_control(args.input_files, mode=mode)
+    return apply(file, args)
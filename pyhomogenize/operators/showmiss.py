@@ -5,9 +5,17 @@ showmiss : Print missing timestamps. At first, merge files if needed.
     usage: pyhomogenize showmiss ifile1 [ifile2 [ifileN]]
 """
 
+mode = "time"
 
-def start(args):
-    file = pyh.time_control(args.input_files)
-    missings = file.get_missings()
+
+def apply(file, args):
+    missings = file.get_missings(
+        intervals=getattr(args, "intervals", False),
+    )
     print("Missing time steps: ", missings)
     return missings
+
+
+def start(args):
+    file = pyh.time_control(args.input_files, mode=mode)
+    return apply(file, args)
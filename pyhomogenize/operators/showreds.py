@@ -5,9 +5,17 @@ showreds : Print redundant timestamps. At first, merge files if needed.
     usage: netcdf_time_control showreds ifile1 [ifile2 [ifileN]]
 """
 
+mode = "time"
 
-def start(args):
-    file = pyh.time_control(args.input_files)
-    redundants = file.get_redundants()
+
+def apply(file, args):
+    redundants = file.get_redundants(
+        intervals=getattr(args, "intervals", False),
+    )
     print("Redundant time steps: ", redundants)
     return redundants
+
+
+def start(args):
+    file = pyh.time_control(args.input_files, mode=mode)
+    return apply(file, args)
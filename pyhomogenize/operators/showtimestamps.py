@@ -5,9 +5,15 @@ showtimestamps : Show available timestamps. At first, merge files if needed.
     usage: pyhomogenize showtimestamps -i ifile1 [ifile2 [ifileN]]
 """
 
+mode = "time"
 
-def start(args):
-    file = pyh.time_control(args.input_files)
+
+def apply(file, args):
     time = file.time
     print(time)
     return time
+
+
+def start(args):
+    file = pyh.time_control(args.input_files, mode=mode)
+    return apply(file, args)
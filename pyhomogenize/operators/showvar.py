@@ -5,9 +5,15 @@ showvar : Print variable names. At first, merge files if needed.
     usage: pyhomogenize showvar -i ifile1 [ifile2 [ifileN]]
 """
 
+mode = "time"
 
-def start(args):
-    file = pyh.netcdf_basics(args.input_files)
+
+def apply(file, args):
     name = file.name
     print(name)
     return name
+
+
+def start(args):
+    file = pyh.netcdf_basics(args.input_files, mode=mode)
+    return apply(file, args)
@@ -1,25 +1,33 @@
+from functools import partial
+
 import pyhomogenize as pyh
 
 help = """
 timecheck : By default, delete duplicated and redundant time stamps
 from input files and write duplicated, redundant and missing timestamps
 to netcdf variable attributes. The selection is changeable.
+With --state, check the input files as continuation of the time axis
+checked before and update the state file.
     usage: pyhomogenize timecheck[,duplicates,redundants,missings]
-                        -i ifile1 [ifile2 [ifileN]] -o ofile
+                        -i ifile1 [ifile2 [ifileN]] -o ofile [--intervals]
+                        [--state state.json]
 """
 
+mode = "full"
 
-def start(args):
-    file = pyh.time_control(args.input_files)
-    if not args.output_file:
-        print("No output file selecetd. Use -o <ofile>.")
+
+def apply(file, args):
+    selection = ["duplicates", "redundants", "missings"]
     if args.arguments:
-        file.check_timestamps(
-            selection=args.arguments,
-            output=args.output_file,
-        )
-    else:
-        file.check_timestamps(output=args.output_file)
+        selection = args.arguments
+    check = file.check_timestamps
+    if getattr(args, "state", None):
+        check = partial(file.check_increment, state=args.state)
+    check(
+        selection=selection,
+        correct=bool(args.output_file),
+        intervals=getattr(args, "intervals", False),
+    )
     if not args.output_file:
         if hasattr(file, "duplicated_timesteps"):
             print("Duplicated time steps: ", file.duplicated_timesteps)
@@ -28,3 +36,13 @@ def start(args):
         if hasattr(file, "missing_timesteps"):
             print("Missing time steps: ", file.missing_timesteps)
     return file.ds
+
+
+def start(args):
+    file = pyh.time_control(args.input_files)
+    if not args.output_file:
+        print("No output file selecetd. Use -o <ofile>.")
+    apply(file, args)
+    if args.output_file:
+        file.write(output=args.output_file)
+    return file.ds
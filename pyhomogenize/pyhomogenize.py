@@ -4,13 +4,70 @@ from . import _utilities as ut
 from . import operators as op
 
 
+def _pipeline(args, chain):
+    """Apply a chain of operators to one opened dataset.
+    The result is written once at the end.
+    """
+    funcs = []
+    # check if all selected operators are available
+    for operator in chain:
+        func = ut.get_operator(op, operator[0], type="operator")
+        if not func:
+            return
+        funcs += [(func, operator[1:])]
+    # check if all input files are available
+    if not ut.check_existance(args.input_files):
+        return
+    from ._time_control import time_control
+
+    mode = "full"
+    if all(func.mode == "time" for func, _ in funcs):
+        mode = "time"
+    file = time_control(args.input_files, mode=mode)
+    for func, arguments in funcs:
+        args.arguments = arguments
+        result = func.apply(file, args)
+    if args.output_file:
+        file.write(output=args.output_file)
+    return result
+
+
 def pyhomogenize(args):
+    # write report of all processing stages
+    report = getattr(args, "report", None)
+    if report:
+        from ._instrumentation import span_recorder
+
+        args.report = None
+        with span_recorder() as recorder:
+            result = pyhomogenize(args)
+        recorder.to_json(report)
+        return result
+    # configure dask scheduler of all processing stages
+    scheduler = getattr(args, "scheduler", None)
+    workers = getattr(args, "workers", None)
+    memory_limit = getattr(args, "memory_limit", None)
+    if scheduler or workers or memory_limit:
+        from ._scheduler import scheduler_context
+
+        args.scheduler = args.workers = args.memory_limit = None
+        with scheduler_context(scheduler, workers, memory_limit):
+            return pyhomogenize(args)
     # show all available operators
     if args.operators:
         print(op.operators)
         return
-    operator = args.operator[0]
-    arguments = args.operator[1:]
+    chain = args.operator
+    if chain and isinstance(chain[0], str):
+        chain = [chain]
+    # apply chain of operators
+    if chain and len(chain) > 1:
+        return _pipeline(args, chain)
+    operator = None
+    arguments = []
+    if chain:
+        operator = chain[0][0]
+        arguments = chain[0][1:]
     args.operator = operator
     args.arguments = arguments
     # check if selected operator is available
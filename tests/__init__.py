@@ -22,3 +22,4 @@ has_numpy, requires_numpy = _importskip("numpy")
 has_iteration_utilities, requires_iteration_utilities = _importskip(
     "iteration_utilities"
 )
+has_zarr, requires_zarr = _importskip("zarr")
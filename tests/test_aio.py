@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# flake8: noqa
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pyhomogenize as pyh
+
+from . import has_numpy  # noqa
+from . import has_xarray  # noqa
+from . import requires_numpy  # noqa
+from . import requires_xarray  # noqa
+
+
+def test_atime_control_open():
+    async def check(files):
+        tcos = await asyncio.gather(
+            *[pyh.atime_control.open(file, mode="time") for file in files]
+        )
+        return await asyncio.gather(
+            *[pyh.acheck_timestamps(tco, selection="duplicates") for tco in tcos]
+        )
+
+    tcos = asyncio.run(check(pyh.test_netcdf))
+    assert all(isinstance(tco, pyh.time_control) for tco in tcos)
+    expected = pyh.time_control(pyh.test_netcdf[0])
+    expected.check_timestamps(selection="duplicates")
+    assert tcos[0].duplicated_timesteps == expected.duplicated_timesteps
+    assert tcos[0].ds.tas.attrs == expected.ds.tas.attrs
+
+
+def test_atime_control_get():
+    missings = asyncio.run(pyh.atime_control.get_missings(pyh.test_netcdf[0]))
+    assert missings == pyh.time_control(pyh.test_netcdf[0]).get_missings()
+
+
+def test_atime_control_timeout():
+    async def check(executor):
+        running = pyh._aio.arun(time.sleep, 0.2, executor=executor)
+        running = asyncio.ensure_future(running)
+        with pytest.raises(asyncio.TimeoutError):
+            await pyh.atime_control.open(
+                pyh.test_netcdf[0],
+                executor=executor,
+                timeout=1e-3,
+            )
+        await running
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        asyncio.run(check(executor))
+
+
+def test_atime_control_cancel():
+    async def check(executor):
+        running = asyncio.ensure_future(
+            pyh._aio.arun(time.sleep, 0.2, executor=executor)
+        )
+        queued = asyncio.ensure_future(
+            pyh.atime_control.open(pyh.test_netcdf[0], executor=executor)
+        )
+        await asyncio.sleep(0)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        await running
+        return queued
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert asyncio.run(check(executor)).cancelled()
+
+
+def test_atime_compare_open():
+    async def check():
+        return await pyh.atime_compare.open(
+            pyh.test_netcdf[0],
+            pyh.test_netcdf[2],
+            "missing.nc",
+            timeout=60,
+        )
+
+    tcm = asyncio.run(check())
+    assert isinstance(tcm, pyh.time_compare)
+    assert len(tcm.time_control_objects) == 2
+    assert tcm.failures[0][0] == "missing.nc"
+    expected = pyh.time_compare(pyh.test_netcdf[0], pyh.test_netcdf[2])
+    assert tcm.max_intersection() == expected.max_intersection()
+
+    async def check_missing():
+        return await pyh.atime_compare.open("missing.nc", timeout=60)
+
+    with pytest.raises(ValueError):
+        asyncio.run(check_missing())
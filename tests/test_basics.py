@@ -35,3 +35,65 @@ def test_date_range_to_frequency_limits():
 
     frequency = ["MS", "M"]
     assert basics.date_range_to_frequency_limits(start, end, frequency=frequency)
+
+
+def test_encode_time():
+    basics = pyh.basics()
+    for calendar in ["standard", "noleap", "360_day"]:
+        time = xr.cftime_range("1582-09-01", "1583-03-01", freq="6H", calendar=calendar)
+        ignore = ["minute", "second", "microsecond", "nanosecond"]
+        encoded = basics._encode_time(time, ignore=ignore)
+        assert (encoded[1:] - encoded[:-1] == 6).all()
+        decoded = basics._decode_time(encoded, ignore=ignore, calendar=calendar)
+        assert [d.strftime("%Y%m%d%H") for d in decoded] == [
+            t.strftime("%Y%m%d%H") for t in time
+        ]
+
+
+def test_str_to_date():
+    basics = pyh.basics()
+    date = basics.str_to_date("2007-06-01T12:30")
+    assert (date.year, date.month, date.day, date.hour, date.minute) == (
+        2007,
+        6,
+        1,
+        12,
+        30,
+    )
+    end = basics.str_to_date("2007", mode="end")
+    assert end.strftime("%Y-%m-%dT%H:%M:%S") == "2007-12-31T23:59:59"
+    end = basics.str_to_date("2008-02", mode="end", calendar="noleap")
+    assert end.strftime("%Y-%m-%d") == "2008-02-28"
+    end = basics.str_to_date("20080201", fmt="%Y%m%d", mode="end")
+    assert end.strftime("%Y-%m-%dT%H:%M:%S") == "2008-02-01T23:59:59"
+    dates = basics.str_to_date(["2007-01-01", "2008-01-01", "2007-01-01"])
+    assert [d.year for d in dates] == [2007, 2008, 2007]
+    assert basics.str_to_date("2007", mode="middle") is None
+    for string in ["abc", "2007-13", "2007-02-30"]:
+        with pytest.raises(ValueError):
+            basics.str_to_date(string)
+    with pytest.raises(ValueError):
+        basics.str_to_date("2007", fmt="%Y-%j")
+
+
+def test_convert_time():
+    basics = pyh.basics()
+    values = [20070101.5, 20070102.5, 20070104.75]
+    attrs = {"units": "day as %Y%m%d.%f", "calendar": "standard"}
+    time = xr.DataArray(values, dims="time", attrs=attrs)
+    time = xr.Dataset(coords={"time": time}).time
+    converted = basics._convert_time(time)
+    assert converted.dtype == "datetime64[ns]"
+    assert str(converted[2]) == "2007-01-04 18:00:00"
+    time.attrs["calendar"] = "360_day"
+    converted = basics._convert_time(time)
+    assert converted.calendar == "360_day"
+    assert converted[2].hour == 18
+    attrs = {"units": "days since 1850-01-01", "calendar": "noleap"}
+    time = xr.DataArray([0, 1, 365], dims="time", attrs=attrs)
+    time = xr.Dataset(coords={"time": time})
+    converted = basics._convert_time(time.time)
+    assert converted.calendar == "noleap"
+    assert converted[2].year == 1851
+    time = xr.decode_cf(time).time
+    assert basics._convert_time(time) is time.indexes["time"]
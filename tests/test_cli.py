@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 # flake8: noqa
 
+import json
+import os
+import subprocess
+import sys
+
 import pytest
 
 import pyhomogenize as pyh
@@ -47,6 +52,24 @@ def test_cli_showmiss():
     pyh.pyhomogenize(args)
 
 
+def test_cli_showmiss_intervals():
+    parser = pyh.create_parser()
+    args = parser.parse_args(["showmiss", "-i", pyh.test_netcdf[0], "--intervals"])
+    assert args.intervals
+    pyh.pyhomogenize(args)
+
+
+def test_cli_apply_without_intervals():
+    import argparse
+
+    from pyhomogenize import operators
+
+    args = argparse.Namespace(output_file=None, arguments=None)
+    file = pyh.time_control(pyh.test_netcdf[0])
+    for name in ["showdups", "showmiss", "showreds", "timecheck"]:
+        getattr(operators, name).apply(file, args)
+
+
 def test_cli_showreds():
     parser = pyh.create_parser()
     args = parser.parse_args(["showreds", "-i", pyh.test_netcdf[0]])
@@ -75,3 +98,147 @@ def test_cli_timecheck_sel():
     parser = pyh.create_parser()
     args = parser.parse_args(["timecheck,duplicates", "-i", pyh.test_netcdf[0]])
     assert pyh.pyhomogenize(args)
+
+
+def test_cli_pipeline():
+    parser = pyh.create_parser()
+    args = parser.parse_args(
+        [
+            "timecheck:seltimerange,20070501,20070630:showtimestamps",
+            "-i",
+            pyh.test_netcdf[0],
+            "-o",
+            "test.nc",
+        ]
+    )
+    time = pyh.pyhomogenize(args)
+    assert len(time) == 61
+    assert len(pyh.time_control("test.nc").time) == 61
+
+
+def test_cli_scheduler():
+    parser = pyh.create_parser()
+    args = parser.parse_args(
+        [
+            "timecheck",
+            "-i",
+            pyh.test_netcdf[0],
+            "-o",
+            "test.nc",
+            "-j",
+            "2",
+            "--scheduler",
+            "synchronous",
+        ]
+    )
+    assert args.workers == 2
+    assert pyh.pyhomogenize(args)
+
+
+def test_cli_state(tmp_path):
+    parser = pyh.create_parser()
+    state = (tmp_path / "state.json").as_posix()
+    for netcdffile in [pyh.test_netcdf[0], pyh.test_netcdf[3]]:
+        args = parser.parse_args(["timecheck", "-i", netcdffile, "--state", state])
+        pyh.pyhomogenize(args)
+    with open(state) as f:
+        state = json.load(f)
+    assert state["start"] == "2007-01-01T01:01:01"
+    assert state["end"] == "2008-12-31T01:01:01"
+    assert state["length"] == 729
+    assert state["duplicates"] == "2007-01-10T01:01:01,2007-02-20T01:01:01"
+    assert state["files"] == [pyh.test_netcdf[0], pyh.test_netcdf[3]]
+
+
+def test_cli_memory_limit(tmp_path):
+    parser = pyh.create_parser()
+    output = (tmp_path / "out.nc").as_posix()
+    args = parser.parse_args(
+        [
+            "timecheck",
+            "-i",
+            pyh.test_netcdf[0],
+            "-o",
+            output,
+            "--memory_limit",
+            "4GB",
+        ]
+    )
+    assert args.memory_limit == "4GB"
+    assert pyh.pyhomogenize(args)
+    assert len(pyh.time_control(output).time) == 363
+
+
+@requires_dask
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="requires /proc")
+def test_cli_memory_limit_peak(tmp_path):
+    # about 600 MB of data checked with a budget of 200 MB in a fresh
+    # process whose peak memory does not include the test session's
+    memory_limit = 200 * 1024**2
+    file = pyh.data.synthetic_netcdf(
+        (tmp_path / "input.nc").as_posix(),
+        length=940,
+        grid=(400, 400),
+        duplicates=3,
+        missings=3,
+    )
+    assert os.path.getsize(file) > 2.5 * memory_limit
+    output = (tmp_path / "output.nc").as_posix()
+    script = (
+        "import sys; import pyhomogenize as pyh; "
+        "from pyhomogenize._instrumentation import _peak_rss; "
+        "args = ['timecheck', '-i', sys.argv[1], '-o', sys.argv[2], "
+        "'--memory_limit', '200MB']; "
+        "pyh.pyhomogenize(pyh.create_parser().parse_args(args)); "
+        "print(_peak_rss())"
+    )
+    peak = subprocess.run(
+        [sys.executable, "-c", script, file, output],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()[-1]
+    assert int(peak) <= 1.1 * memory_limit
+    assert len(pyh.time_control(output, mode="time").time) == 937
+
+
+def test_cli_report(tmp_path):
+    report = (tmp_path / "report.json").as_posix()
+    parser = pyh.create_parser()
+    args = parser.parse_args(
+        [
+            "timecheck",
+            "-i",
+            pyh.test_netcdf[0],
+            "-o",
+            "test.nc",
+            "--report",
+            report,
+        ]
+    )
+    pyh.pyhomogenize(args)
+    with open(report) as f:
+        spans = json.load(f)["spans"]
+    names = [span["name"] for span in spans]
+    for name in ["open", "decode", "equalize", "diagnose", "select", "write"]:
+        assert name in names
+    assert all(span["wall_time"] >= 0 for span in spans)
+
+
+def test_cli_startup():
+    # startup time is measured by benchmarks/imports.py
+    script = (
+        "import sys; "
+        "import pyhomogenize as pyh; parser = pyh.create_parser(); "
+        "pyh.pyhomogenize(parser.parse_args(['-ops'])); "
+        "pyh.pyhomogenize(parser.parse_args(['showvar', '-i', 'missing.nc'])); "
+        "heavy = ['xarray', 'pandas', 'numpy', 'dask', 'cftime']; "
+        "print([m for m in heavy if m in sys.modules])"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    assert output[-1] == "[]"
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# flake8: noqa
+
+import pytest
+
+import pyhomogenize as pyh
+
+from . import has_numpy  # noqa
+from . import has_xarray  # noqa
+from . import requires_numpy  # noqa
+from . import requires_xarray  # noqa
+
+
+@pytest.mark.parametrize(
+    "frequency,calendar,redundants",
+    [
+        ("1hr", "standard", 2),
+        ("day", "noleap", 0),
+        ("mon", "360_day", 0),
+        ("yr", "proleptic_gregorian", 0),
+    ],
+)
+def test_synthetic_netcdf(tmp_path, frequency, calendar, redundants):
+    output = (tmp_path / "synthetic.nc").as_posix()
+    pyh.data.synthetic_netcdf(
+        output,
+        frequency=frequency,
+        calendar=calendar,
+        length=100,
+        grid=(3, 4),
+        duplicates=3,
+        missings=4,
+        redundants=redundants,
+    )
+    time_control = pyh.time_control(output)
+    assert time_control.calendar == calendar
+    assert time_control.ds.tas.shape == (99 + redundants, 3, 4)
+    assert time_control.time.is_monotonic_increasing
+    assert len(time_control._duplicates()) == 3
+    assert len(time_control._missings()) == 4
+    assert len(time_control._redundants()) == redundants
+
+
+def test_synthetic_netcdf_redundants(tmp_path):
+    with pytest.raises(ValueError):
+        pyh.data.synthetic_netcdf(
+            (tmp_path / "synthetic.nc").as_posix(),
+            redundants=1,
+        )
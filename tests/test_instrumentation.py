@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# flake8: noqa
+
+import pytest
+
+import pyhomogenize as pyh
+
+from . import has_dask  # noqa
+from . import has_xarray  # noqa
+from . import requires_dask  # noqa
+from . import requires_xarray  # noqa
+
+netcdffile = pyh.test_netcdf[0]
+
+
+def test_span_callback():
+    records = []
+    pyh.add_span_callback(records.append)
+    try:
+        pyh.time_control(netcdffile).check_timestamps(correct=True)
+    finally:
+        pyh.remove_span_callback(records.append)
+    names = [record["name"] for record in records]
+    assert names == [
+        "open",
+        "decode",
+        "convert_time",
+        "equalize",
+        "diagnose",
+        "select",
+    ]
+    assert records[0]["dask_tasks"] > 0
+    assert records[0]["peak_rss"] > 0
+    pyh.time_control(netcdffile).time
+    assert len(records) == 6
+
+
+def test_span_recorder(tmp_path):
+    with pyh.span_recorder() as recorder:
+        pyh.time_control(netcdffile, mode="time").get_duplicates()
+        with pytest.raises(OSError):
+            pyh.open_xrdataset("missing.nc")
+    assert [record["name"] for record in recorder.spans][:2] == [
+        "open",
+        "convert_time",
+    ]
+    assert recorder.spans[-1]["error"]
+    assert recorder.summary()["open"]["count"] == 2
+    report = (tmp_path / "report.json").as_posix()
+    assert recorder.to_json(report)
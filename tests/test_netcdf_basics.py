@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # flake8: noqa
 
+import numpy as np
 import pytest
 
 import pyhomogenize as pyh
@@ -28,3 +29,62 @@ def test_netcdf_basics():
 def test_netcdf_basics_fmt():
     netcdfbasics = pyh.netcdf_basics(netcdffile, fmt="%Y%m%d")
     assert netcdfbasics.fmt
+
+
+def test_netcdf_basics_time_mode():
+    netcdfbasics = pyh.netcdf_basics(netcdffile, mode="time")
+    assert not netcdfbasics.ds.data_vars
+    assert netcdfbasics.name == pyh.netcdf_basics(netcdffile).name
+    assert netcdfbasics.write(output="test.nc")
+    assert netcdfbasics.ds.data_vars
+
+
+@requires_dask
+def test_netcdf_basics_scheduler(tmp_path):
+    import dask
+
+    for scheduler in ["threads", "processes", "synchronous"]:
+        netcdfbasics = pyh.netcdf_basics(netcdffile, scheduler=scheduler, workers=2)
+        output = (tmp_path / "{}.nc".format(scheduler)).as_posix()
+        assert netcdfbasics.write(output=output)
+        assert not netcdfbasics.compute().ds.chunks
+    with pyh.scheduler_context("synchronous", workers=2):
+        assert dask.config.get("scheduler") == "synchronous"
+    assert dask.config.get("scheduler", None) is None
+
+
+@pytest.mark.parametrize("priority", ["first", "last"])
+def test_netcdf_basics_priority(priority):
+    ds = pyh.open_xrdataset(pyh.test_netcdf[3])
+    segments = [
+        ds.isel(time=slice(100, 200)) + 1,
+        ds.isel(time=slice(0, 120)),
+        ds.isel(time=slice(150, 366)) + 2,
+        ds.isel(time=slice(160, 170)) + 3,
+    ]
+    netcdfbasics = pyh.netcdf_basics(segments, priority=priority)
+    concat = netcdfbasics.ds
+    assert concat.time.equals(ds.time)
+    assert netcdfbasics.overlaps == {"datasets": 4, "dropped": 80}
+    if priority == "first":
+        winners = {50: 0, 110: 1, 160: 1, 199: 1, 200: 2}
+    else:
+        winners = {50: 0, 110: 0, 160: 3, 199: 2, 200: 2}
+    for step, offset in winners.items():
+        assert concat.tas.isel(time=step).equals(ds.tas.isel(time=step) + offset)
+    tc = pyh.time_control(segments, priority=priority)
+    assert tc.get_duplicates() == ""
+    assert len(pyh.time_control(segments).ds.time) == 446
+
+
+def test_netcdf_basics_priority_gap():
+    ds = pyh.open_xrdataset(pyh.test_netcdf[3])
+    winner = ds.isel(time=np.r_[0:50, 100:200])
+    loser = ds.isel(time=slice(0, 200)) + 1
+    netcdfbasics = pyh.netcdf_basics([winner, loser], priority="first")
+    concat = netcdfbasics.ds
+    assert concat.time.equals(ds.time.isel(time=slice(0, 200)))
+    assert netcdfbasics.overlaps == {"datasets": 2, "dropped": 150}
+    assert concat.tas.isel(time=10).equals(ds.tas.isel(time=10))
+    assert concat.tas.isel(time=60).equals(ds.tas.isel(time=60) + 1)
+    assert concat.tas.isel(time=150).equals(ds.tas.isel(time=150))
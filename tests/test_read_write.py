@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# flake8: noqa
+
+import numpy as np
+import pytest
+import xarray as xr
+
+import pyhomogenize as pyh
+
+from . import has_dask  # noqa
+from . import has_numpy  # noqa
+from . import has_xarray  # noqa
+from . import has_zarr  # noqa
+from . import requires_dask  # noqa
+from . import requires_numpy  # noqa
+from . import requires_xarray  # noqa
+from . import requires_zarr  # noqa
+
+netcdffile = pyh.test_netcdf[0]
+
+
+def test_get_disk_chunks():
+    chunks = pyh.read_write.get_disk_chunks(netcdffile, size_opt=1e-3)
+    ds = pyh.open_xrdataset(netcdffile, chunks=chunks)
+    assert ds.tas.chunks[0][0] == chunks["time"]
+    assert (
+        ds.tas.chunks[0][0] == pyh.read_write.get_chunksizes(ds.tas, size_opt=1e-3)[0]
+    )
+
+
+def test_open_xrdataset_disk_chunks():
+    ds = pyh.open_xrdataset(netcdffile)
+    assert ds.tas.data.npartitions == 1
+
+
+def test_open_time_axis_cache(tmp_path):
+    cache = pyh.time_axis_cache(tmp_path.as_posix())
+    ds = pyh.open_time_axis(netcdffile, cache=cache)
+    assert cache.get(netcdffile)
+    assert pyh.open_time_axis(netcdffile, cache=cache).identical(ds)
+    cache.max_size = 0
+    cache.put(netcdffile, *cache.get(netcdffile))
+    assert cache.get(netcdffile) is None
+
+
+def test_get_encoding_compression():
+    ds = pyh.open_xrdataset(netcdffile)
+    encoding = pyh.read_write.get_encoding(ds, compression="zlib")
+    assert encoding["tas"]["zlib"]
+    assert encoding["tas"]["complevel"] == 4
+    encoding = pyh.read_write.get_encoding(
+        ds,
+        encoding={"tas": {"complevel": 9}},
+        compression="zlib",
+        significant_digits=3,
+    )
+    assert encoding["tas"]["complevel"] == 9
+    assert encoding["tas"]["significant_digits"] == 3
+    encoding = pyh.read_write.get_encoding(ds, compression=None)
+    assert not encoding["tas"]["zlib"]
+
+
+def test_save_xrdataset_inherit_compression(tmp_path):
+    compressed = (tmp_path / "compressed.nc").as_posix()
+    output = (tmp_path / "output.nc").as_posix()
+    ds = pyh.open_xrdataset(netcdffile)
+    pyh.save_xrdataset(
+        ds,
+        compressed,
+        encoding_dict={"compression": "zlib", "complevel": 7},
+    )
+    pyh.time_control(compressed).check_timestamps(output=output)
+    encoding = pyh.open_xrdataset(output).tas.encoding
+    assert encoding["zlib"]
+    assert encoding["complevel"] == 7
+
+
+@requires_zarr
+@pytest.mark.parametrize("store", ["test.zarr", "test.zip"])
+def test_save_xrdataset_zarr(tmp_path, store):
+    store = (tmp_path / store).as_posix()
+    ds = pyh.open_xrdataset(netcdffile)
+    pyh.save_xrdataset(ds, store)
+    assert pyh.read_write.is_zarr(store)
+    assert pyh.open_xrdataset(store).tas.equals(ds.tas)
+    assert pyh.open_time_axis(store).time.equals(ds.time)
+    assert pyh.time_control(store).get_duplicates()
+
+
+@requires_zarr
+def test_save_xrdataset_zarr_append(tmp_path):
+    store = (tmp_path / "test.zarr").as_posix()
+    ds = pyh.open_xrdataset(netcdffile)
+    pyh.save_xrdataset(
+        ds.isel(time=slice(0, 100)),
+        store,
+        encoding_dict={"chunk_dict": {"size_opt": 48 * 7 / 1024**2}},
+    )
+    pyh.save_xrdataset(ds.isel(time=slice(100, None)), store, append=True)
+    zarr = pyh.open_xrdataset(store)
+    assert zarr.tas.encoding["chunks"][0] == 7
+    assert zarr.tas.equals(ds.tas)
+    assert zarr.time.equals(ds.time)
+    assert pyh.save_xrdataset(ds, "test.nc", append=True) is None
+
+
+@requires_dask
+def test_limit_chunks():
+    ds = pyh.open_xrdataset(netcdffile).chunk({"time": 100})
+    size_opt = ds.tas.isel(time=slice(0, 30)).nbytes / 1024**2
+    chunks = pyh.read_write.limit_chunks(ds, size_opt=size_opt).tas.chunks[0]
+    assert max(chunks) <= 30
+    assert sum(chunks) == ds.sizes["time"]
+    bounds = set(np.cumsum(ds.tas.chunks[0]))
+    assert bounds <= set(np.cumsum(chunks))
+    assert pyh.read_write.limit_chunks(ds).tas.chunks == ds.tas.chunks
+
+
+def test_classify_variables(tmp_path):
+    dims = ("time", "rlat", "rlon")
+    ds = pyh.open_xrdataset(netcdffile).rename({"lat": "rlat", "lon": "rlon"})
+    ds = ds.assign(
+        tas=ds.tas.assign_attrs(
+            coordinates="lat lon height",
+            grid_mapping="rotated_pole",
+            cell_measures="area: areacella",
+        ),
+        time_bnds=(("time", "bnds"), np.zeros((ds.sizes["time"], 2))),
+        lat=(dims[1:], np.zeros((3, 4))),
+        lon=(dims[1:], np.zeros((3, 4))),
+        height=((), 2.0),
+        rotated_pole=((), 0),
+        areacella=(dims[1:], np.ones((3, 4))),
+        orog=(dims[1:], np.ones((3, 4))),
+    )
+    ds.time.attrs["bounds"] = "time_bnds"
+    roles = pyh.classify_variables(ds)
+    assert roles == {
+        "data_vars": ["tas"],
+        "bounds": ["time_bnds"],
+        "auxiliary_coords": ["lat", "lon", "height"],
+        "ancillary": ["rotated_pole", "areacella"],
+    }
+    assert pyh.classify_variables(ds) == roles
+    assert pyh.classify_variables(ds.isel(time=[0, 1])) == roles
+    pyh.classify_variables(ds)["data_vars"].append("orog")
+    assert pyh.get_var_name(ds) == ["tas"]
+    ds["pr"] = ds.tas
+    assert pyh.get_var_name(ds) == ["tas", "pr"]
+    output = (tmp_path / "roles.nc").as_posix()
+    ds.to_netcdf(output)
+    time_axis = pyh.open_time_axis(output, cache=tmp_path.as_posix())
+    assert pyh.classify_variables(time_axis) == pyh.classify_variables(
+        pyh.open_xrdataset(output)
+    )
+    cached = pyh.open_time_axis(output, cache=tmp_path.as_posix())
+    assert cached.attrs["CF_variables"] == ["tas", "pr"]
+    assert pyh.classify_variables(cached)["bounds"] == ["time_bnds"]
+    cached.attrs["CF_variables"].append("orog")
+    assert pyh.get_var_name(cached) == ["tas", "pr"]
+
+
+def test_classify_unreferenced_bounds():
+    time = np.arange(4)
+    ds = xr.Dataset(
+        {
+            "time_bnds": (("time", "bnds"), np.zeros((4, 2))),
+            "tas": ("time", np.zeros(4)),
+        },
+        coords={"time": time},
+    )
+    roles = pyh.classify_variables(ds)
+    assert roles["data_vars"] == ["tas"]
+    assert roles["bounds"] == ["time_bnds"]
+    assert "cf_variables" not in ds.encoding
+    assert pyh.get_var_name(ds[["time_bnds"]]) == ["time_bnds"]
+    with pytest.raises(ValueError):
+        pyh.get_var_name(ds[["time"]])
+
+
+@requires_dask
+def test_memory_limit_chunks(tmp_path, monkeypatch):
+    # budget of one MB per chunk buffer independent of the process' RSS
+    monkeypatch.setattr(pyh._scheduler, "_rss", lambda: 0)
+    memory_limit = pyh._scheduler.buffers_per_task
+    file = pyh.data.synthetic_netcdf(
+        (tmp_path / "input.nc").as_posix(),
+        length=100,
+        grid=(100, 100),
+    )
+    output = (tmp_path / "output.nc").as_posix()
+    with pyh.scheduler_context("threads", 1, memory_limit=memory_limit):
+        assert pyh._scheduler.get_chunk_size() == 1
+        ds = pyh.open_xrdataset(file)
+        encoding = pyh.read_write.get_encoding(ds)
+        pyh.save_xrdataset(ds.chunk({"time": -1}), output)
+    assert ds.tas.data.chunksize[0] * 100 * 100 * 4 <= 1024**2
+    assert encoding["tas"]["chunksizes"][0] * 100 * 100 * 4 <= 1024**2
+    assert pyh.open_xrdataset(output).tas.equals(ds.tas)
+
+
+def test_memory_limit_exceeded(monkeypatch):
+    # chunks shrink to the minimum if the budget is already used
+    monkeypatch.setattr(pyh._scheduler, "_rss", lambda: 2 * 1024**3)
+    assert pyh._scheduler.get_chunk_size("1GB", workers=1) == 1
@@ -28,3 +28,41 @@ def test_time_compare():
     assert pyh.time_compare(
         [time_control1.ds], time_control2.ds
     ).select_max_intersection(output="test.nc")
+
+
+def test_time_compare_workers():
+    netcdffiles = [pyh.test_netcdf[1], "missing.nc", pyh.test_netcdf[2]]
+    serial = pyh.time_compare(netcdffiles)
+    parallel = pyh.time_compare(netcdffiles, workers=2)
+    assert len(parallel.failures) == 1
+    assert len(parallel.time_control_objects) == 2
+    assert parallel.max_intersection() == serial.max_intersection()
+
+
+def test_time_compare_failures(capsys):
+    with pytest.raises(ValueError):
+        pyh.time_compare("missing.nc", "missing2.nc")
+    time_compare = pyh.time_compare(pyh.test_netcdf[0], "missing.nc")
+    capsys.readouterr()
+    time_compare.max_intersection()
+    assert "missing.nc" in capsys.readouterr().out
+    for tco in time_compare.select_max_intersection():
+        assert tco.ds.attrs["failed_compare_objects"] == "['missing.nc']"
+
+
+def test_common_timesteps():
+    netcdffiles = [pyh.test_netcdf[0], pyh.test_netcdf[1], pyh.test_netcdf[2]]
+    time_compare = pyh.time_compare(netcdffiles)
+    common = time_compare.common_timesteps()
+    expected = set.intersection(
+        *[set(tco._encoded_time.tolist()) for tco in time_compare.time_control_objects]
+    )
+    assert len(common) == len(expected)
+    assert common.is_monotonic_increasing
+    start, end = time_compare.max_intersection()
+    assert start <= common[0] and common[-1] <= end
+    selected = time_compare.select_common_timesteps()
+    for tco in selected:
+        assert tco.ds.tas.chunks is not None
+        assert len(tco.time) == len(common)
+        assert (tco._encoded_time == selected[0]._encoded_time).all()
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 # flake8: noqa
 
+import json
+
+import numpy as np
 import pytest
+import xarray as xr
 
 import pyhomogenize as pyh
 
@@ -30,6 +34,18 @@ def test_get_redundants():
     time_control.get_redundants()
 
 
+def test_compare_to_date_range():
+    time = time_control._encoded_time
+    values = np.unique(time)
+    found, missings = time_control._compare_to_date_range(time, values)
+    expected = np.unique(time_control._encoded_date_range(time))
+    np.testing.assert_array_equal(missings, np.setdiff1d(expected, values))
+    np.testing.assert_array_equal(
+        values[~found],
+        np.setdiff1d(values, expected),
+    )
+
+
 def test_check_timestamps():
     assert time_control.check_timestamps(output="test.nc")
     assert time_control.check_timestamps(selection="duplicates")
@@ -42,6 +58,20 @@ def test_select_time_range():
     )
 
 
+def test_select_time_range_pruning(tmp_path):
+    tc = pyh.time_control(netcdffile).select_time_range(["2008-03-01", "2008-03-31"])
+    assert tc.pruning == {"files": 2, "opened": 1, "pruned": 1}
+    assert tc.files == netcdffile
+    assert tc.opened_files == netcdffile[1:]
+    assert len(tc.time) == 31
+    tc.write(output=(tmp_path / "pruned.nc").as_posix())
+    for file in netcdffile:
+        assert file in tc.ds.tas.attrs["associated_files"]
+    tc = pyh.time_control(netcdffile).select_time_range(["2007-12-01", "2008-01-31"])
+    assert tc.pruning["pruned"] == 0
+    assert len(tc.time) == 62
+
+
 def test_within_time_range():
     time_control.within_time_range(["2007-06-01", "2008-06-30"])
     time_control.within_time_range(["2006-06-01", "2008-06-30"])
@@ -52,3 +82,88 @@ def test_select_limited_time_range():
     time_control.select_limited_time_range(
         output="test.nc", smonth=[3, 6, 9, 12], emonth=[2, 5, 8, 11]
     )
+
+
+def test_lazy_attributes():
+    tc = pyh.time_control(netcdffile)
+    assert "time" not in tc.__dict__
+    ntime = len(tc.time)
+    assert "time" in tc.__dict__
+    tc.select_time_range(["2007-06-01", "2007-06-30"])
+    assert "time" not in tc.__dict__
+    assert len(tc.time) == 30 < ntime
+
+
+def test_intervals():
+    time = xr.cftime_range("2000-01-01", "2000-12-31", freq="D")
+    keep = np.ones(len(time), dtype=bool)
+    keep[10:40] = False
+    keep[100] = False
+    ds = xr.Dataset(
+        {"tas": ("time", np.zeros(keep.sum()))},
+        coords={"time": time[keep]},
+        attrs={"frequency": "day"},
+    )
+    tc = pyh.time_control(ds)
+    missings = tc.get_missings()
+    assert len(missings.split(",")) == 31
+    assert missings.startswith("2000-01-11T01:01:01,2000-01-12T01:01:01")
+    assert tc.get_missings(intervals=True) == (
+        "2000-01-11T01:01:01/2000-02-09T01:01:01/30,2000-04-10T01:01:01"
+    )
+    assert tc.get_duplicates(intervals=True) == ""
+    tc.check_timestamps(selection="missings", intervals=True)
+    assert tc.ds.tas.attrs["missing_timesteps"] == tc.get_missings(intervals=True)
+
+
+@requires_dask
+def test_isel_time_aligned():
+    tc = pyh.time_control(pyh.test_netcdf[1])
+    tc.ds = tc.ds.chunk({"time": 50})
+    timesteps = np.array([0, 3, 49, 50, 51, 120, 299])
+    ds = tc._isel_time(timesteps)
+    assert ds.tas.chunks[0] == (3, 2, 1, 1)
+    assert ds.tas.equals(tc.ds.tas.isel(time=timesteps))
+
+
+def test_check_increment(tmp_path):
+    time = xr.cftime_range("2000-01-01", "2000-12-31", freq="D")
+
+    def segment(index):
+        return xr.Dataset(
+            {"tas": ("time", np.zeros(len(index)))},
+            coords={"time": time[index]},
+            attrs={"frequency": "day"},
+        )
+
+    state = (tmp_path / "state.json").as_posix()
+    first = np.r_[0:50, 49:100]
+    tc = pyh.time_control(segment(first)).check_increment(state)
+    assert tc.state["end"] == "2000-04-09T01:01:01"
+    assert tc.state["duplicates"] == "2000-02-19T01:01:01"
+    second = np.r_[98:100, 105:366]
+    tc = pyh.time_control(segment(second))
+    tc.check_increment(state, correct=True, intervals=True)
+    with open(state) as f:
+        assert tc.state == json.load(f)
+    assert tc.state["start"] == "2000-01-01T01:01:01"
+    assert tc.state["end"] == "2000-12-31T01:01:01"
+    assert tc.state["length"] == 361
+    assert tc.state["duplicates"] == (
+        "2000-02-19T01:01:01,2000-04-08T01:01:01/2000-04-09T01:01:01/2"
+    )
+    assert tc.state["missings"] == "2000-04-10T01:01:01/2000-04-14T01:01:01/5"
+    assert len(tc.time) == 261
+    # overlapping time steps are kept unless duplicates are selected
+    previous = dict(tc.state, end="2000-12-29T01:01:01")
+    tc = pyh.time_control(segment(np.r_[360:366]))
+    tc.check_increment(previous, selection="missings", correct=True)
+    assert len(tc.time) == 6
+    assert tc.state["end"] == "2000-12-31T01:01:01"
+    tc = pyh.time_control(segment(np.r_[360:363]))
+    tc.check_increment(previous, selection="missings", correct=True)
+    assert len(tc.time) == 3
+    assert tc.state["end"] == "2000-12-29T01:01:01"
+    tc = pyh.time_control(segment(second).assign_attrs(frequency="mon"))
+    with pytest.raises(ValueError):
+        tc.check_increment(state)